@@ -1,8 +1,15 @@
 import time
 import os
 import re
+import math
+import atexit
+import threading
 import urllib.parse
-from flask import Flask, request, jsonify
+import json
+import copy
+import gzip
+import functools
+from flask import Flask, request, jsonify, Response, send_file
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -10,15 +17,463 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from driver_pool import DriverPool, DriverPoolExhausted
+from launcher import LaunchManager
+from resources import ResourceBlocker
+from memory import MemoryWatchdog, container_memory, kill_process_tree
+from deadline import Deadline, DeadlineExceeded, clamp as clamp_timeout, check as check_deadline
+from jobs import JobManager, JobQueueFull
+from job_queue import open_job_queue
+from rate_limit import HostThrottle, parse_host_delays
+from cache import ResultCache, SingleFlight
+from profile_index import ProfileIndex
+from scheduler import EngineScheduler
+from artifacts import ArtifactStore
+from roles import load_roles, table_columns
+import export
+import waits
+import extract
+import engines
+import metrics
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
 
 # Initialize the Flask app
 app = Flask(__name__)
 
+# Driver pool settings
+DRIVER_POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 2))
+DRIVER_MAX_USES = int(os.environ.get('DRIVER_MAX_USES', 20))
+DRIVER_CHECKOUT_TIMEOUT = float(os.environ.get('DRIVER_CHECKOUT_TIMEOUT', 60))
+CHROME_PAGE_LOAD_STRATEGY = os.environ.get('CHROME_PAGE_LOAD_STRATEGY', 'eager')
+
+# Warm-up at worker boot (see gunicorn.conf.py)
+WARMUP_BROWSERS = int(os.environ.get('WARMUP_BROWSERS', 1))
+LAUNCH_STATE_PATH = os.environ.get('LAUNCH_STATE_PATH', '/tmp/scrape_cache/chrome_launch.json')
+# After a failed webdriver-manager install, launches use Selenium Manager for this long before retrying it
+CHROMEDRIVER_INSTALL_RETRY = int(os.environ.get('CHROMEDRIVER_INSTALL_RETRY', 600))
+_warmup_state = {"status": "idle"}
+
+# Where per-browser profile dirs live; point at a tmpfs mount for faster launches
+CHROME_PROFILE_ROOT = os.environ.get('CHROME_PROFILE_ROOT', os.environ.get('CHROME_USER_DATA_DIR'))
+launch_manager = LaunchManager(CHROME_PROFILE_ROOT)
+
+# What result-page loads may fetch: 'off', 'standard' (no images, fonts, media,
+# trackers) or 'strict' (also stylesheets and Google's own JS). Set a control
+# rate (e.g. 0.05) to run that share of navigations unblocked and measure the
+# bytes and time saved; off by default, since control loads are full-weight.
+RESOURCE_BLOCKING = os.environ.get('RESOURCE_BLOCKING', 'standard')
+RESOURCE_BLOCKING_CONTROL_RATE = float(os.environ.get('RESOURCE_BLOCKING_CONTROL_RATE', 0))
+resource_blocker = ResourceBlocker(RESOURCE_BLOCKING, RESOURCE_BLOCKING_CONTROL_RATE)
+# How Google results are read: 'page_source' (one snapshot parsed locally),
+# 'script' (one execute_script returning JSON) or 'webdriver' (per-element calls)
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'page_source')
+GOOGLE_BASE_URL = os.environ.get('GOOGLE_BASE_URL', 'https://www.google.com').rstrip('/')
+
+# Recycle a browser between jobs once its process tree grows past this (0 disables)
+DRIVER_MAX_MEMORY_MB = float(os.environ.get('DRIVER_MAX_MEMORY_MB', 700))
+MEMORY_WATCHDOG_INTERVAL = float(os.environ.get('MEMORY_WATCHDOG_INTERVAL', 30))
+
+_driver_pool = None
+_driver_pool_pid = None
+_memory_watchdog = None
+_driver_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    """Return this process's driver pool, creating it on first use.
+
+    Created lazily (and per-PID) so gunicorn's --preload master never owns
+    browsers that forked workers would inherit.
+    """
+    global _driver_pool, _driver_pool_pid, _memory_watchdog
+    with _driver_pool_lock:
+        if _driver_pool is None or _driver_pool_pid != os.getpid():
+            _memory_watchdog = None
+            should_retire = None
+            if DRIVER_MAX_MEMORY_MB > 0:
+                # Checked at checkin for busy drivers and every interval for idle ones
+                _memory_watchdog = MemoryWatchdog(int(DRIVER_MAX_MEMORY_MB * 2**20), MEMORY_WATCHDOG_INTERVAL)
+                should_retire = _memory_watchdog.over_limit
+            _driver_pool = DriverPool(
+                initialize_chrome_driver,
+                size=DRIVER_POOL_SIZE,
+                max_uses=DRIVER_MAX_USES,
+                checkout_timeout=DRIVER_CHECKOUT_TIMEOUT,
+                on_retire=release_driver_resources,
+                should_retire=should_retire,
+            )
+            if _memory_watchdog is not None:
+                _memory_watchdog.start(_driver_pool)
+            _driver_pool_pid = os.getpid()
+        return _driver_pool
+
+def shutdown_driver_pool():
+    """Quit pooled browsers when the worker exits."""
+    if _driver_pool is not None and _driver_pool_pid == os.getpid():
+        if _memory_watchdog is not None:
+            _memory_watchdog.stop()
+        _driver_pool.close()
+
+atexit.register(shutdown_driver_pool)
+
+# Background job settings
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 10))
+JOB_TTL = int(os.environ.get('JOB_TTL', 3600))
+SCRAPE_TIMEOUT = float(os.environ.get('SCRAPE_TIMEOUT', 240))
+# Extra time past the deadline before a stuck driver is killed outright
+DRIVER_KILL_GRACE = float(os.environ.get('DRIVER_KILL_GRACE', 5))
+# How long to wait for a killed browser tree to exit before its profile dir is removed anyway
+DRIVER_KILL_WAIT = float(os.environ.get('DRIVER_KILL_WAIT', 5))
+
+_job_manager = None
+_job_manager_pid = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """Return this process's job manager, creating it on first use."""
+    global _job_manager, _job_manager_pid
+    with _job_manager_lock:
+        if _job_manager is None or _job_manager_pid != os.getpid():
+            _job_manager = JobManager(max_workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE, ttl=JOB_TTL)
+            _job_manager_pid = os.getpid()
+        return _job_manager
+
+def shutdown_job_manager():
+    """Stop accepting jobs and drop queued ones when the worker exits."""
+    if _job_manager is not None and _job_manager_pid == os.getpid():
+        _job_manager.shutdown(wait=False)
+
+atexit.register(shutdown_job_manager)
+
+# Durable queue shared with separate browser workers (`python worker.py`), e.g.
+# sqlite:////tmp/scrape_cache/jobs.sqlite3 or redis://host:6379/0. When set, this
+# process only enqueues scrapes and reads results; empty runs them in-process.
+JOB_QUEUE_URL = os.environ.get('JOB_QUEUE_URL', '')
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 2))
+job_queue = open_job_queue(
+    JOB_QUEUE_URL,
+    max_pending=JOB_QUEUE_SIZE,
+    lease_seconds=SCRAPE_TIMEOUT + DRIVER_KILL_GRACE + 60,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    ttl=JOB_TTL,
+) if JOB_QUEUE_URL else None
+
+def get_job_backend():
+    """Where scrape jobs go: the shared queue in worker mode, else this process's job manager."""
+    return job_queue if job_queue is not None else get_job_manager()
+
+# Admission control: turn requests away up front rather than letting them queue
+# past their deadline or push the container into an OOM kill
+ADMISSION_MEMORY_LIMIT = float(os.environ.get('ADMISSION_MEMORY_LIMIT', 0.9))  # working set, as a share of the cgroup limit
+
+def admission_check(deadline_seconds=None):
+    """Return (reason, message) if new scrape work should be shed right now, else None."""
+    memory = container_memory()
+    if memory and ADMISSION_MEMORY_LIMIT > 0 and memory[0] > memory[1] * ADMISSION_MEMORY_LIMIT:
+        return "memory", f"Memory at {memory[0] / memory[1]:.0%} of the container limit"
+    if deadline_seconds is not None:
+        queued_for = get_job_backend().estimated_wait()
+        if queued_for >= deadline_seconds:
+            return "deadline", f"Queue wait (~{queued_for:.0f}s) exceeds the {deadline_seconds:g}s deadline"
+    return None
+
+def busy_response(endpoint, reason, body, retry_after=None):
+    """A 503 with Retry-After, counted by endpoint and reason."""
+    metrics.ADMISSION_REJECTIONS.inc(endpoint=endpoint, reason=reason)
+    if retry_after is None:
+        retry_after = get_job_backend().retry_after()
+    return jsonify(body), 503, {"Retry-After": str(retry_after)}
+
+# Per-host pacing shared by every scrape in this process
+SEARCH_HOST_DELAY = float(os.environ.get('SEARCH_HOST_DELAY', 2))
+SEARCH_HOST_DELAYS = parse_host_delays(os.environ.get('SEARCH_HOST_DELAYS', ''))
+SEARCH_HOST_BUDGET = int(os.environ.get('SEARCH_HOST_BUDGET', 30))
+SEARCH_HOST_WINDOW = float(os.environ.get('SEARCH_HOST_WINDOW', 60))
+host_throttle = HostThrottle(SEARCH_HOST_DELAY, SEARCH_HOST_DELAYS, jitter=1.0,
+                             budget=SEARCH_HOST_BUDGET, window=SEARCH_HOST_WINDOW)
+
+# Executor for the individual role queries of each company
+SEARCH_QUERY_WORKERS = int(os.environ.get('SEARCH_QUERY_WORKERS', 4))
+
+_query_executor = None
+_query_executor_pid = None
+_query_executor_lock = threading.Lock()
+
+def get_query_executor():
+    """Return this process's query executor, creating it on first use.
+
+    Kept separate from the job and batch executors so a company waiting on its
+    queries can never starve them of threads.
+    """
+    global _query_executor, _query_executor_pid
+    with _query_executor_lock:
+        if _query_executor is None or _query_executor_pid != os.getpid():
+            _query_executor = ThreadPoolExecutor(max_workers=SEARCH_QUERY_WORKERS, thread_name_prefix="scrape-query")
+            _query_executor_pid = os.getpid()
+        return _query_executor
+
+# Search engines, tried in order until one finds profiles. The HTTP engines are
+# cheap; 'google' needs a Chrome driver, which the pool only launches on demand.
+SEARCH_ENGINE_ORDER = [name.strip() for name in
+                       os.environ.get('SEARCH_ENGINE_ORDER', 'duckduckgo,bing,google').split(',')
+                       if name.strip()]
+
+# Seconds before the next engine in the order is started alongside a slow one;
+# 0 queries them all at once, negative goes back to one engine at a time
+SEARCH_HEDGE_DELAY = float(os.environ.get('SEARCH_HEDGE_DELAY', 1.5))
+
+# Re-rank SEARCH_ENGINE_ORDER per query from each engine's recent hit rate and
+# latency, and back off engines that answer 429/503 or a block page (see scheduler.py)
+SEARCH_ADAPTIVE_ORDER = os.environ.get('SEARCH_ADAPTIVE_ORDER', '1') != '0'
+ENGINE_STATS_PATH = os.environ.get('ENGINE_STATS_PATH', '/tmp/scrape_cache/engine_stats.json')
+ENGINE_BACKOFF_BASE = float(os.environ.get('ENGINE_BACKOFF_BASE', 30))
+ENGINE_BACKOFF_MAX = float(os.environ.get('ENGINE_BACKOFF_MAX', 900))
+
+# Chrome only starts once every HTTP engine has come back empty or failed; never hedged
+BROWSER_ENGINES = [name for name in SEARCH_ENGINE_ORDER if name not in engines.HTTP_ENGINES]
+
+engine_scheduler = None
+if SEARCH_ADAPTIVE_ORDER:
+    engine_scheduler = EngineScheduler(SEARCH_ENGINE_ORDER, ENGINE_STATS_PATH,
+                                       base_backoff=ENGINE_BACKOFF_BASE, max_backoff=ENGINE_BACKOFF_MAX)
+    atexit.register(engine_scheduler.save)
+
+engine_runner = engines.EngineRunner(
+    {
+        "duckduckgo": functools.partial(engines.search_duckduckgo, throttle=host_throttle),
+        "bing": functools.partial(engines.search_bing, throttle=host_throttle),
+        "google": lambda query, max_results, deadline=None: search_google_selenium(query, max_results, deadline),
+    },
+    SEARCH_ENGINE_ORDER,
+    hedge_delay=SEARCH_HEDGE_DELAY,
+    max_workers=SEARCH_QUERY_WORKERS * max(1, len(SEARCH_ENGINE_ORDER) - len(BROWSER_ENGINES)),
+    default_timeout=SCRAPE_TIMEOUT,
+    scheduler=engine_scheduler,
+    browser_engines=BROWSER_ENGINES,
+)
+
+# Result cache settings
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', '1') != '0'
+RESULT_CACHE_PATH = os.environ.get('RESULT_CACHE_PATH', '/tmp/scrape_cache/results.sqlite3')
+RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 86400))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 5000))
+
+result_cache = ResultCache(RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES)
+company_flight = SingleFlight()
+
+# Every profile found per company and role, kept across runs (see profile_index.py)
+PROFILE_INDEX_ENABLED = os.environ.get('PROFILE_INDEX_ENABLED', '1') != '0'
+PROFILE_INDEX_PATH = os.environ.get('PROFILE_INDEX_PATH', '/tmp/scrape_cache/profiles.sqlite3')
+PROFILE_INDEX_MAX_AGE = int(os.environ.get('PROFILE_INDEX_MAX_AGE', 30 * 86400))
+
+profile_index = ProfileIndex(PROFILE_INDEX_PATH, max_age=PROFILE_INDEX_MAX_AGE)
+
+def known_profiles(company_name, role, max_results):
+    """Known-good profiles for a role from earlier runs, best first; [] if the index is off or failing."""
+    if not PROFILE_INDEX_ENABLED:
+        return []
+    try:
+        return profile_index.known(company_name, role, limit=max_results)
+    except Exception as e:
+        print(f"Profile index lookup failed: {e}")
+        return []
+
+def fill_from_index(company_name, role, found, known, max_results):
+    """Record freshly found profiles, then top the slots up with known ones not found this time."""
+    if PROFILE_INDEX_ENABLED and found:
+        try:
+            new = profile_index.record(company_name, role, found)
+            print(f"Profile index: {new} new {role} profile(s) for '{company_name}'")
+        except Exception as e:
+            print(f"Profile index update failed: {e}")
+    profiles = list(found or [])
+    urls = {profile["url"] for profile in profiles}
+    for profile in known:
+        if len(profiles) >= max_results:
+            break
+        if profile["url"] not in urls:
+            profiles.append(profile)
+    return profiles
+
+# Failure captures (full HTML, screenshot, timings) kept on disk; responses only carry their id
+ARTIFACT_ROOT = os.environ.get('ARTIFACT_ROOT', '/tmp/scrape_cache/artifacts')
+ARTIFACT_MAX_COUNT = int(os.environ.get('ARTIFACT_MAX_COUNT', 200))
+ARTIFACT_MAX_MB = float(os.environ.get('ARTIFACT_MAX_MB', 100))
+ARTIFACT_MAX_AGE = int(os.environ.get('ARTIFACT_MAX_AGE', 3 * 86400))
+ARTIFACT_SCREENSHOTS = os.environ.get('ARTIFACT_SCREENSHOTS', '1') != '0'
+
+artifact_store = ArtifactStore(ARTIFACT_ROOT, max_count=ARTIFACT_MAX_COUNT,
+                               max_bytes=int(ARTIFACT_MAX_MB * 2**20), max_age=ARTIFACT_MAX_AGE)
+
+NAVIGATION_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+return nav ? nav.toJSON() : null;
+"""
+
+def capture_failure(driver, kind, **details):
+    """Save the driver's full page, a screenshot and `details` as an artifact; returns its id or None."""
+    html = screenshot = None
+    try:
+        details["url"] = driver.current_url
+        html = driver.page_source
+        details["navigation_timing"] = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+        if ARTIFACT_SCREENSHOTS:
+            screenshot = driver.get_screenshot_as_png()
+    except Exception as e:
+        details["capture_error"] = str(e)[:300]
+    try:
+        artifact_id = artifact_store.save(kind, html=html, screenshot=screenshot, details=details)
+    except Exception as e:
+        print(f"Could not save failure artifact: {e}")
+        return None
+    print(f"Saved failure artifact {artifact_id}")
+    return artifact_id
+
+# Roles searched per company and their result slots: inline JSON or a JSON file
+# (see roles.py); the defaults are the SDE x5 / HR x2 layout. Query text is part
+# of the cache key, so changing a template never serves stale results.
+ROLES = load_roles(os.environ.get('ROLE_TEMPLATES', ''))
+TABLE_COLUMNS = table_columns(ROLES)
+
+def result_cache_key(template, company_name, max_results):
+    return f"{template}|{company_name.strip().lower()}|{max_results}"
+
+def cache_lookup(key):
+    """Return (profiles, age_seconds) from the result cache, or None on a miss or cache error."""
+    if not RESULT_CACHE_ENABLED:
+        return None
+    try:
+        entry = result_cache.get(key)
+    except Exception as e:
+        print(f"Result cache lookup failed: {e}")
+        return None
+    metrics.CACHE_REQUESTS.inc(result="hit" if entry else "miss")
+    return entry
+
+def cache_store(key, profiles):
+    """Cache non-empty results only, so a block page or outage isn't remembered for a day."""
+    if not RESULT_CACHE_ENABLED or not profiles:
+        return
+    try:
+        result_cache.set(key, profiles)
+    except Exception as e:
+        print(f"Result cache store failed: {e}")
+
+def describe_cache_entry(entry):
+    if entry is None:
+        return {"hit": False}
+    return {"hit": True, "age_seconds": round(entry[1])}
+
+# Batch settings
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', DRIVER_POOL_SIZE))
+BATCH_MAX_COMPANIES = int(os.environ.get('BATCH_MAX_COMPANIES', 500))
+BATCH_MAX_INFLIGHT = int(os.environ.get('BATCH_MAX_INFLIGHT', 1))
+BATCH_RETRY_AFTER = int(os.environ.get('BATCH_RETRY_AFTER', 60))
+_batch_slots = threading.BoundedSemaphore(max(1, BATCH_MAX_INFLIGHT))
+
+_batch_executor = None
+_batch_executor_pid = None
+_batch_executor_lock = threading.Lock()
+
+def get_batch_executor():
+    """Return this process's batch executor, creating it on first use."""
+    global _batch_executor, _batch_executor_pid
+    with _batch_executor_lock:
+        if _batch_executor is None or _batch_executor_pid != os.getpid():
+            _batch_executor = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="scrape-batch")
+            _batch_executor_pid = os.getpid()
+        return _batch_executor
+
+def run_batch(companies, concurrency):
+    """Scrape `companies` with at most `concurrency` in flight, yielding (index, result) as each finishes."""
+    executor = get_batch_executor()
+    pending = {}
+    remaining = iter(enumerate(companies))
+
+    def fill():
+        for index, company_name in remaining:
+            scrape = scrape_with_selenium if job_queue is None else scrape_through_queue
+            pending[executor.submit(scrape, company_name)] = (index, company_name)
+            if len(pending) >= concurrency:
+                break
+
+    fill()
+    try:
+        while pending:
+            done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, company_name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = create_empty_result(company_name, "Scraping Error", str(e))
+                yield index, result
+            fill()
+    finally:
+        # Client went away mid-stream: don't start the rest of the batch
+        for future in pending:
+            future.cancel()
+
+def scrape_through_queue(company_name):
+    """Hand one scrape to a browser worker and wait for its result, within SCRAPE_TIMEOUT."""
+    deadline = Deadline(SCRAPE_TIMEOUT)
+    job = submit_scrape_job(company_name, deadline)
+    if not job.wait(timeout=deadline.remaining() + DRIVER_KILL_GRACE):
+        metrics.TIMEOUTS.inc(stage="scrape")
+        return create_empty_result(company_name, "Timeout Error", "Process took too long.")
+    if job.result is None:
+        return create_empty_result(company_name, "Scraping Error", job.error or "Job failed")
+    return job.result
+
+def submit_scrape_job(company_name, deadline=None):
+    """Queue a scrape for `company_name` on the shared executor or the worker queue."""
+    if job_queue is not None:
+        payload = {"company": company_name}
+        if deadline is not None:
+            # Monotonic clocks don't cross processes; workers rebuild the deadline from wall time
+            payload["deadline_at"] = time.time() + deadline.remaining()
+        return job_queue.submit("scrape", payload, meta={"company": company_name})
+    return get_job_manager().submit(scrape_with_selenium, company_name, deadline, meta={"company": company_name})
+
 # Health check endpoint for Render
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "ok"}), 200
+    warming_up = _warmup_state.get("status") == "running"
+    response = {"status": "warming_up" if warming_up else "ok", "warmup": dict(_warmup_state)}
+    if _driver_pool is not None and _driver_pool_pid == os.getpid():
+        response["driver_pool"] = _driver_pool.stats()
+    if _memory_watchdog is not None and _driver_pool_pid == os.getpid():
+        response["driver_memory"] = _memory_watchdog.stats()
+    if job_queue is not None:
+        try:
+            response["jobs"] = job_queue.stats()
+        except Exception as e:
+            response["jobs"] = {"error": str(e)}
+    elif _job_manager is not None and _job_manager_pid == os.getpid():
+        response["jobs"] = _job_manager.stats()
+    memory = container_memory()
+    if memory:
+        response["container_memory"] = {"working_set_bytes": memory[0], "limit_bytes": memory[1]}
+    response["host_requests"] = host_throttle.stats()
+    response["waits"] = waits.wait_stats()
+    response["engines"] = engine_runner.stats()
+    if engine_scheduler is not None:
+        response["engine_scheduler"] = engine_scheduler.stats()
+    response["http_sessions"] = engines.session_stats()
+    response["chrome_profiles"] = launch_manager.stats()
+    response["resource_blocking"] = resource_blocker.stats()
+    if RESULT_CACHE_ENABLED:
+        try:
+            response["result_cache"] = result_cache.stats()
+        except Exception as e:
+            response["result_cache"] = {"error": str(e)}
+    response["artifacts"] = artifact_store.stats()
+    if PROFILE_INDEX_ENABLED:
+        try:
+            response["profile_index"] = profile_index.stats()
+        except Exception as e:
+            response["profile_index"] = {"error": str(e)}
+    return jsonify(response), 503 if warming_up else 200
 
 # Main scrape endpoint with timeout protection
 @app.route('/scrape', methods=['POST'])
@@ -30,15 +485,30 @@ def scrape_linkedin_profiles():
         
         company_name = data['company']
         
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(scrape_with_selenium, company_name)
-            try:
-                # Set a total timeout for the entire scraping process
-                result = future.result(timeout=240) 
-                return jsonify(result)
-            except FutureTimeoutError:
-                print("!!! Main scraping process timed out !!!")
-                return jsonify(create_empty_result(company_name, "Timeout Error", "Process took too long."))
+        rejected = admission_check(SCRAPE_TIMEOUT)
+        if rejected:
+            return busy_response("scrape", rejected[0], create_empty_result(company_name, "Busy", rejected[1]))
+
+        # One deadline for the entire scraping process, including time spent queued
+        deadline = Deadline(SCRAPE_TIMEOUT)
+        try:
+            job = submit_scrape_job(company_name, deadline)
+        except JobQueueFull as e:
+            return busy_response("scrape", "queue_full", create_empty_result(company_name, "Busy", str(e)))
+
+        # The scrape returns whatever it has at the deadline; the grace covers wrapping up
+        if job.wait(timeout=deadline.remaining() + DRIVER_KILL_GRACE):
+            if job.result is None:
+                return jsonify(create_empty_result(company_name, "Scraping Error", job.error or "Job failed"))
+            if "retry_after" in job.result:
+                return busy_response("scrape", "engines_backoff", job.result, retry_after=job.result["retry_after"])
+            return jsonify(job.result)
+
+        print("!!! Main scraping process timed out !!!")
+        metrics.TIMEOUTS.inc(stage="scrape")
+        result = create_empty_result(company_name, "Timeout Error", "Process took too long.")
+        result["job_id"] = job.id
+        return jsonify(result)
                 
     except Exception as e:
         print(f"!!! Unexpected error in main endpoint: {e} !!!")
@@ -48,18 +518,236 @@ def scrape_linkedin_profiles():
             str(e)
         ))
 
-def get_chrome_options():
+# Batch endpoint: many companies per call
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    data = request.get_json(silent=True)
+    companies = data.get('companies') if isinstance(data, dict) else None
+    if not isinstance(companies, list) or not companies:
+        return jsonify({"error": "A non-empty 'companies' list is required"}), 400
+    if not all(isinstance(company, str) and company.strip() for company in companies):
+        return jsonify({"error": "Every company must be a non-empty string"}), 400
+    if len(companies) > BATCH_MAX_COMPANIES:
+        return jsonify({"error": f"At most {BATCH_MAX_COMPANIES} companies per batch"}), 400
+
+    try:
+        concurrency = int(data.get('concurrency', BATCH_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'concurrency' must be an integer"}), 400
+    concurrency = max(1, min(concurrency, BATCH_CONCURRENCY))
+
+    export_format = data.get('format', 'json')
+    if export_format not in ('json', 'csv', 'xlsx'):
+        return jsonify({"error": "'format' must be one of json, csv, xlsx"}), 400
+    if export_format == 'xlsx' and not export.XLSX_AVAILABLE:
+        return jsonify({"error": "XLSX export needs the openpyxl package"}), 400
+
+    rejected = admission_check()
+    if rejected:
+        return busy_response("batch", rejected[0], {"error": rejected[1]})
+    if not _batch_slots.acquire(blocking=False):
+        return busy_response("batch", "batch_limit", {"error": f"At most {BATCH_MAX_INFLIGHT} batch(es) run at once"},
+                             retry_after=BATCH_RETRY_AFTER)
+
+    if export_format != 'json':
+        # Rows go out in completion order, one per finished company; Index is the input position
+        stream = export.stream_csv if export_format == 'csv' else export.stream_xlsx
+        mimetype = 'text/csv' if export_format == 'csv' else export.XLSX_MIMETYPE
+
+        response = Response(stream(TABLE_COLUMNS, run_batch(companies, concurrency)), mimetype=mimetype,
+                            headers={'Content-Disposition': f'attachment; filename=profiles.{export_format}'})
+        # Released when the server closes the response, even if the client left before the first chunk
+        response.call_on_close(_batch_slots.release)
+        return response
+
+    if data.get('stream'):
+        def generate():
+            for index, result in run_batch(companies, concurrency):
+                line = {"index": index, "company": companies[index], **result}
+                yield json.dumps(line) + "\n"
+
+        response = Response(generate(), mimetype='application/x-ndjson')
+        response.call_on_close(_batch_slots.release)
+        return response
+
+    rows = [None] * len(companies)
+    debug_info = {}
+    try:
+        for index, result in run_batch(companies, concurrency):
+            rows[index] = result["excel_data"][0]
+            if result.get("debug_info"):
+                debug_info[str(index)] = result["debug_info"]
+    finally:
+        _batch_slots.release()
+
+    response = {"excel_data": rows}
+    if debug_info:
+        response["debug_info"] = debug_info
+    return jsonify(response)
+
+# Prometheus scrape target
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+def _driver_pool_samples():
+    if _driver_pool is None or _driver_pool_pid != os.getpid():
+        return []
+    stats = _driver_pool.stats()
+    return [({"state": key}, stats[key]) for key in ("idle", "in_use", "starting", "created", "reused",
+                                                     "retired_max_uses", "retired_unhealthy",
+                                                     "retired_over_limit")]
+
+def _memory_samples():
+    samples = []
+    memory = container_memory()
+    if memory:
+        samples += [({"scope": "container"}, memory[0]), ({"scope": "container_limit"}, memory[1])]
+    if _memory_watchdog is not None and _driver_pool_pid == os.getpid():
+        samples.append(({"scope": "driver_max"}, _memory_watchdog.stats()["max_driver_bytes"]))
+    return samples
+
+def _job_samples():
+    if job_queue is not None:
+        return [({"state": key}, value) for key, value in job_queue.stats().items()]
+    if _job_manager is None or _job_manager_pid != os.getpid():
+        return []
+    return [({"state": key}, value) for key, value in _job_manager.stats().items()]
+
+def _engine_samples():
+    return [({"engine": name}, entry["hit_rate"]) for name, entry in engine_runner.stats().items()
+            if entry["hit_rate"] is not None]
+
+def _engine_latency_samples():
+    samples = []
+    for name, entry in engine_runner.stats().items():
+        for quantile, key in ((0.5, "p50_seconds"), (0.95, "p95_seconds"), (0.99, "p99_seconds")):
+            if entry[key] is not None:
+                samples.append(({"engine": name, "quantile": quantile}, entry[key]))
+    return samples
+
+def _engine_backoff_samples():
+    if engine_scheduler is None:
+        return []
+    return [({"engine": name}, entry["backoff_remaining"]) for name, entry in engine_scheduler.stats().items()]
+
+def _http_session_samples():
+    return [({"engine": name, "kind": kind}, entry[kind]) for name, entry in engines.session_stats().items()
+            for kind in ("requests", "connections", "reused")]
+
+metrics.REGISTRY.add_gauge_collector("scrape_driver_pool", "Driver pool state and lifetime counts", _driver_pool_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_memory_bytes", "Container memory and the largest browser tree", _memory_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_jobs", "Background job counts by state", _job_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_engine_hit_rate", "Share of queries where the engine found profiles", _engine_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_engine_latency_seconds", "Recent engine latency percentiles", _engine_latency_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_engine_backoff_seconds", "Seconds left before a backed-off engine is tried again", _engine_backoff_samples)
+metrics.REGISTRY.add_gauge_collector("scrape_http_connections", "Engine HTTP requests, new connections and keep-alive reuse", _http_session_samples)
+
+# Failure captures referenced by artifact_id in error responses
+@app.route('/artifacts/<artifact_id>', methods=['GET'])
+def get_artifact(artifact_id):
+    meta = artifact_store.meta(artifact_id)
+    if meta is None:
+        return jsonify({"error": "Artifact not found"}), 404
+    if meta.pop("has_html"):
+        meta["html_url"] = f"/artifacts/{artifact_id}/html"
+    if meta.pop("has_screenshot"):
+        meta["screenshot_url"] = f"/artifacts/{artifact_id}/screenshot"
+    return jsonify(meta), 200
+
+@app.route('/artifacts/<artifact_id>/html', methods=['GET'])
+def get_artifact_html(artifact_id):
+    path = artifact_store.html_path(artifact_id)
+    if path is None:
+        return jsonify({"error": "Artifact not found"}), 404
+    # Stored gzipped; pass it through untouched when the client can take it
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = send_file(path, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+    with gzip.open(path, 'rb') as f:
+        return Response(f.read(), mimetype='text/html')
+
+@app.route('/artifacts/<artifact_id>/screenshot', methods=['GET'])
+def get_artifact_screenshot(artifact_id):
+    path = artifact_store.screenshot_path(artifact_id)
+    if path is None:
+        return jsonify({"error": "Artifact not found"}), 404
+    return send_file(path, mimetype='image/png')
+
+# Asynchronous job API
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    data = request.get_json(silent=True)
+    if not data or 'company' not in data:
+        return jsonify({"error": "Company name not provided"}), 400
+
+    rejected = admission_check()
+    if rejected:
+        return busy_response("jobs", rejected[0], {"error": rejected[1]})
+    try:
+        job = submit_scrape_job(data['company'])
+    except JobQueueFull as e:
+        return busy_response("jobs", "queue_full", {"error": str(e)})
+
+    response = job.to_dict()
+    response["status_url"] = f"/jobs/{job.id}"
+    response["events_url"] = f"/jobs/{job.id}/events"
+    return jsonify(response), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_backend().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+# Each event stream holds a gunicorn thread until its job finishes; past this many,
+# clients are told to poll /jobs/<id> so /health and /scrape always have a thread
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', max(1, int(os.environ.get('GUNICORN_THREADS', 4)) // 2)))
+_sse_slots = threading.BoundedSemaphore(max(1, SSE_MAX_STREAMS))
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Server-sent events: one `status` event per state change, ending with the result."""
+    job = get_job_backend().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not _sse_slots.acquire(blocking=False):
+        return busy_response("events", "stream_limit",
+                             {"error": f"At most {SSE_MAX_STREAMS} event stream(s) at once; poll the status_url",
+                              "status_url": f"/jobs/{job_id}"},
+                             retry_after=5)
+
+    def generate():
+        version = -1
+        while True:
+            current = job.wait_for_change(version, timeout=15)
+            if current == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+            if job.finished:
+                return
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(_sse_slots.release)
+    return response
+
+def get_chrome_options(profile_dir, port):
     """Configure Chrome options for both local and production environments"""
     options = webdriver.ChromeOptions()
+    # Return from driver.get at DOMContentLoaded; explicit waits cover the rest
+    options.page_load_strategy = CHROME_PAGE_LOAD_STRATEGY
     
     # Check if we're in a production environment (like Render, Heroku, etc.)
     is_production = os.environ.get('NODE_ENV') == 'production' or os.environ.get('PORT') is not None
     
-    # Always create a custom user data directory to avoid conflicts
-    import tempfile
-    temp_dir = tempfile.mkdtemp(prefix='chrome_user_data_')
-    print(f"Using temp Chrome profile: {temp_dir}")
-    options.add_argument(f'--user-data-dir={temp_dir}')
+    # Always use a managed, per-browser user data directory to avoid conflicts
+    print(f"Using temp Chrome profile: {profile_dir}")
+    options.add_argument(f'--user-data-dir={profile_dir}')
     
     if is_production:
         print("Configuring Chrome for production environment...")
@@ -80,7 +768,7 @@ def get_chrome_options():
         # Note: We're using temp profile instead of your real profile to avoid conflicts
     
     # Essential Chrome flags to fix DevTools issues
-    options.add_argument('--remote-debugging-port=9222')
+    options.add_argument(f'--remote-debugging-port={port}')
     options.add_argument('--disable-web-security')
     options.add_argument('--disable-features=VizDisplayCompositor')
     options.add_argument('--disable-ipc-flooding-protection')
@@ -117,173 +805,397 @@ def get_chrome_options():
     
     return options
 
+def record_driver_launch(strategy, started):
+    metrics.DRIVER_LAUNCHES.inc(strategy=strategy)
+    metrics.DRIVER_STARTUP_SECONDS.observe(time.monotonic() - started, strategy=strategy)
+
+def get_minimal_chrome_options(profile_dir, port):
+    """Strategy 2: minimal options"""
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = CHROME_PAGE_LOAD_STRATEGY
+    
+    options.add_argument(f'--user-data-dir={profile_dir}')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument(f'--remote-debugging-port={port}')
+    options.add_argument('--window-size=1920,1080')
+    return options
+
+def get_headless_chrome_options(profile_dir, port):
+    """Strategy 3: forced headless"""
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = CHROME_PAGE_LOAD_STRATEGY
+    
+    options.add_argument(f'--user-data-dir={profile_dir}')
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument(f'--remote-debugging-port={port}')
+    options.add_argument('--window-size=1920,1080')
+    return options
+
+# Launch strategies in fallback order: (number, description, options builder)
+LAUNCH_STRATEGIES = [
+    (1, "optimized options", get_chrome_options),
+    (2, "minimal options", get_minimal_chrome_options),
+    (3, "forced headless", get_headless_chrome_options),
+]
+
 def initialize_chrome_driver():
-    """Initialize Chrome driver with multiple fallback strategies"""
-    driver = None
+    """Initialize Chrome driver with multiple fallback strategies.
+
+    The strategy that last worked on this host is tried first, and the
+    chromedriver binary is resolved once rather than on every launch.
+    """
+    driver_path = resolve_chromedriver_path()
+    preferred = launch_state.get("strategy")
+    strategies = sorted(LAUNCH_STRATEGIES, key=lambda strategy: strategy[0] != preferred)
+
+    for number, description, build_options in strategies:
+        started = time.monotonic()
+        profile_dir, port = launch_manager.acquire()
+        try:
+            print(f"Attempting Chrome driver initialization - Strategy {number} ({description})...")
+            service = Service(driver_path) if driver_path else Service()
+            options = build_options(profile_dir, port)
+            resource_blocker.apply_prefs(options)
+            driver = webdriver.Chrome(service=service, options=options)
+            driver.launch_resources = (profile_dir, port)
+            resource_blocker.install(driver)
+            print(f"✓ Chrome driver initialized with strategy {number}!")
+            record_driver_launch(number, started)
+            remember_launch_state(strategy=number)
+            return driver
+        except Exception as e:
+            print(f"Strategy {number} failed: {e}")
+            launch_manager.release(profile_dir, port)
     
-    # Strategy 1: Try with optimized options
-    try:
-        print("Attempting Chrome driver initialization - Strategy 1...")
-        options = get_chrome_options()
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        print("✓ Chrome driver initialized successfully!")
-        return driver
-    except Exception as e:
-        print(f"Strategy 1 failed: {e}")
-        if driver:
+    raise Exception("All Chrome driver initialization strategies failed")
+
+def release_driver_resources(driver):
+    """Free the debugging port and delete the profile dir of a quit driver."""
+    resources = getattr(driver, "launch_resources", None)
+    if resources:
+        launch_manager.release(*resources)
+
+def resolve_chromedriver_path():
+    """Resolve the chromedriver binary once per process (CHROMEDRIVER_PATH wins).
+
+    Falls back to None, letting Selenium Manager locate a driver itself. A
+    failed install is remembered (across worker restarts too) for
+    CHROMEDRIVER_INSTALL_RETRY seconds, so launches don't each wait on the
+    network again.
+    """
+    with _launch_state_lock:
+        path = launch_state.get("driver_path")
+        if path and os.path.exists(path):
+            return path
+        path = os.environ.get('CHROMEDRIVER_PATH')
+        if not path:
+            failed_at = launch_state.get("driver_install_failed_at") or 0
+            if time.time() - failed_at < CHROMEDRIVER_INSTALL_RETRY:
+                return None
             try:
-                driver.quit()
-            except:
-                pass
-    
-    # Strategy 2: Try with minimal options
+                path = ChromeDriverManager().install()
+            except Exception as e:
+                print(f"!!! Could not resolve chromedriver via webdriver-manager: {e} !!!")
+                remember_launch_state(driver_install_failed_at=time.time())
+                return None
+        launch_state["driver_path"] = path
+    remember_launch_state(driver_path=path)
+    return path
+
+def load_launch_state():
+    """Load the chromedriver path and working strategy saved by a previous worker."""
     try:
-        print("Attempting Chrome driver initialization - Strategy 2 (minimal options)...")
-        options = webdriver.ChromeOptions()
-        import tempfile
-        temp_dir = tempfile.mkdtemp(prefix='chrome_minimal_')
-        
-        options.add_argument(f'--user-data-dir={temp_dir}')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--remote-debugging-port=9223')  # Different port
-        options.add_argument('--window-size=1920,1080')
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        print("✓ Chrome driver initialized with minimal options!")
-        return driver
-    except Exception as e:
-        print(f"Strategy 2 failed: {e}")
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
-    
-    # Strategy 3: Try with headless mode forced
+        with open(LAUNCH_STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def remember_launch_state(**fields):
+    """Persist launch facts so restarted workers skip rediscovery."""
+    with _launch_state_lock:
+        if all(launch_state.get(key) == value for key, value in fields.items()):
+            return
+        launch_state.update(fields)
+        state = dict(launch_state)
     try:
-        print("Attempting Chrome driver initialization - Strategy 3 (forced headless)...")
-        options = webdriver.ChromeOptions()
-        import tempfile
-        temp_dir = tempfile.mkdtemp(prefix='chrome_headless_')
-        
-        options.add_argument(f'--user-data-dir={temp_dir}')
-        options.add_argument('--headless=new')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        print("✓ Chrome driver initialized in headless mode!")
-        return driver
+        os.makedirs(os.path.dirname(LAUNCH_STATE_PATH), exist_ok=True)
+        with open(LAUNCH_STATE_PATH, "w") as f:
+            json.dump(state, f)
+    except OSError as e:
+        print(f"Could not save Chrome launch state: {e}")
+
+_launch_state_lock = threading.RLock()
+launch_state = load_launch_state()
+
+def warm_up(browsers=WARMUP_BROWSERS):
+    """Resolve chromedriver, find a working launch strategy and pre-launch `browsers` browsers."""
+    started = time.monotonic()
+    _warmup_state.update(status="running", started_at=time.time())
+    print("Warming up...")
+    try:
+        resolve_chromedriver_path()
+        if browsers > 0:
+            launched = get_driver_pool().prewarm(browsers)
+            print(f"✓ Pre-launched {launched} Chrome driver(s)")
+        _warmup_state.update(status="ready")
     except Exception as e:
-        print(f"Strategy 3 failed: {e}")
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
-    
-    raise Exception("All Chrome driver initialization strategies failed")
+        # Searches can still use the HTTP engines, so don't hold the worker out of rotation
+        print(f"!!! Warm-up failed: {e} !!!")
+        _warmup_state.update(status="ready", error=str(e))
+    _warmup_state["seconds"] = round(time.monotonic() - started, 3)
+    _warmup_state["strategy"] = launch_state.get("strategy")
+    print(f"Warm-up finished in {_warmup_state['seconds']}s")
 
-def scrape_with_selenium(company_name):
-    """Main scraping function with environment-aware Chrome settings"""
-    
-    sde_query = f'site:linkedin.com/in/ "Software Engineer" "{company_name}" "India"'
-    hr_query = f'site:linkedin.com/in/ "Talent Acquisition" OR "Recruiter" "{company_name}" "India"'
-    
-    driver = None
+def start_warm_up():
+    """Run warm_up in the background; /health reports 503 until it finishes."""
+    if _warmup_state.get("status") in ("running", "ready"):
+        return
+    _warmup_state.update(status="running")
+    # With a worker queue the browsers live in the worker processes, not here
+    browsers = 0 if job_queue is not None else WARMUP_BROWSERS
+    threading.Thread(target=warm_up, args=(browsers,), name="warm-up", daemon=True).start()
+
+def scrape_with_selenium(company_name, deadline=None):
+    """Main scraping function; concurrent calls for the same company share one scrape.
+
+    Everything below runs against `deadline` (SCRAPE_TIMEOUT from now if not
+    given); profiles found before it passes come back as a partial result.
+    """
+    if deadline is None:
+        deadline = Deadline(SCRAPE_TIMEOUT)
+    result, shared = company_flight.do(
+        company_name.strip().lower(), lambda: _scrape_company(company_name, deadline)
+    )
+    result = copy.deepcopy(result)
+    if shared:
+        result["coalesced"] = True
+        for row in result.get("excel_data", []):
+            row["Company Name"] = company_name
+    return result
+
+def _scrape_company(company_name, deadline):
+    """Scrape every configured role for one company, serving each query from the cache when fresh."""
+    keys = {role.name: result_cache_key(role.query, company_name, role.slots) for role in ROLES}
+    cached = {name: cache_lookup(key) for name, key in keys.items()}
+    cache_info = {name: describe_cache_entry(entry) for name, entry in cached.items()}
+
+    if all(cached.values()):
+        print(f"✓ Serving '{company_name}' from the result cache")
+        result = format_for_excel(company_name, "Completed", {name: entry[0] for name, entry in cached.items()})
+        result["cache"] = cache_info
+        return result
+
+    known = {role.name: known_profiles(company_name, role.name, role.slots) for role in ROLES}
+
+    # Run the uncached queries side by side, each on its own pooled driver
+    executor = get_query_executor()
+    futures = {}
+    for role in ROLES:
+        if not cached[role.name]:
+            print(f"\n--- Searching for {role.label} ---")
+            futures[role.name] = executor.submit(
+                search_profiles, role.query_for(company_name), role.slots, deadline, known[role.name])
+
+    wait_futures(list(futures.values()), timeout=deadline.remaining())
+    timed_out = []
+    found = {}
+    failed = {}
+    for role, future in futures.items():
+        if not future.done():
+            # Still running: it will notice the deadline and release its driver
+            future.cancel()
+            timed_out.append(role)
+            continue
+        try:
+            found[role] = future.result()
+        except DeadlineExceeded:
+            timed_out.append(role)
+        except engines.EngineOverloaded as e:
+            # Every engine was backing off, so this role wasn't searched; the others keep their profiles
+            print(f"!!! {role} search skipped: {e} !!!")
+            failed[role] = e
+        except Exception as e:
+            # Every engine failed for this role; the other roles keep their profiles
+            print(f"!!! {role} search failed: {e} !!!")
+            failed[role] = e
+
+    profiles = {}
+    for role in ROLES:
+        if cached[role.name]:
+            profiles[role.name] = cached[role.name][0]
+            continue
+        if role.name in found:
+            metrics.RESULTS_PER_QUERY.observe(len(found[role.name] or []), role=role.name)
+        # A failed search (e.g. CAPTCHA) comes back as None; only real answers are cached
+        profiles[role.name] = fill_from_index(company_name, role.name, found.get(role.name),
+                                              known[role.name], role.slots)
+        if found.get(role.name):
+            cache_store(keys[role.name], profiles[role.name])
+
+    notes = []
+    if timed_out:
+        print(f"!!! Deadline reached before {', '.join(timed_out)} search finished !!!")
+        metrics.TIMEOUTS.inc(stage="scrape")
+        notes.append(f"Deadline of {deadline.seconds:g}s reached before: {', '.join(timed_out)}")
+    backed_off = all(isinstance(e, engines.EngineOverloaded) for e in failed.values())
+    for role, e in failed.items():
+        if isinstance(e, engines.EngineOverloaded):
+            notes.append(f"{role}: search engines are backing off ({e})")
+        else:
+            notes.append(f"{role}: {getattr(e, 'debug_info', f'Error: {e}')}")
+    debug_info = "\n".join(notes)
+    artifact_id = next((e.artifact_id for e in failed.values() if getattr(e, "artifact_id", None)), None)
+
+    if not any(profiles.values()) and (timed_out or failed):
+        if failed and backed_off and not timed_out:
+            # Nothing was searched, so nothing is cached or reported as "no profiles"
+            result = create_empty_result(company_name, "Busy", debug_info)
+            result["retry_after"] = math.ceil(min(e.retry_after or ENGINE_BACKOFF_BASE for e in failed.values()))
+            return result
+        status = "Scraping Error" if failed and not backed_off else "Timeout Error"
+        return create_empty_result(company_name, status, debug_info, artifact_id=artifact_id)
+
+    if timed_out:
+        result = format_for_excel(company_name, "Partial (Timeout)", profiles)
+    elif failed:
+        result = format_for_excel(company_name, "Partial (Busy)" if backed_off else "Partial (Error)", profiles)
+    else:
+        result = format_for_excel(company_name, "Completed", profiles)
+    if debug_info:
+        result["debug_info"] = debug_info
+    if artifact_id:
+        result["artifact_id"] = artifact_id
+        result["artifact_url"] = f"/artifacts/{artifact_id}"
+    result["cache"] = cache_info
+    return result
+
+class ScrapeError(Exception):
+    """A search failed; carries a short summary and the id of the page capture, if one was saved."""
+
+    def __init__(self, message, debug_info, artifact_id=None):
+        super().__init__(message)
+        self.debug_info = debug_info
+        self.artifact_id = artifact_id
+
+def search_profiles(query, max_results, deadline=None, known=()):
+    """Run one query through the search engines in SEARCH_ENGINE_ORDER."""
+    return engine_runner.search(query, max_results, deadline=deadline,
+                                known=[profile["url"] for profile in known])
+
+def search_google_selenium(query, max_results, deadline=None):
+    """Google via a pooled Chrome driver; the browser is only launched when this engine runs."""
+    pool = get_driver_pool()
     try:
-        print("Starting Chrome driver...")
-        driver = initialize_chrome_driver()
-        
-        # Additional stealth measures - more comprehensive
-        # driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-        driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
-        
-        
-        
-        driver.execute_script("""
-            window.navigator.chrome = {
-                runtime: {},
-            };
-        """)
-        
-        driver.execute_script("""
-            Object.defineProperty(navigator, 'permissions', {
-                get: () => ({
-                    query: () => Promise.resolve({ state: 'granted' }),
-                }),
-            });
-        """)
-        
-        # Set realistic screen properties
-        driver.execute_script("""
-            Object.defineProperty(window, 'outerHeight', {
-                get: () => 1080,
-            });
-            Object.defineProperty(window, 'outerWidth', {
-                get: () => 1920,
-            });
-        """)
-        
-        wait = WebDriverWait(driver, 15)  # Increased timeout
+        print("Checking out Chrome driver from pool...")
+        driver = pool.checkout(timeout=clamp_timeout(deadline, DRIVER_CHECKOUT_TIMEOUT))
+    except DriverPoolExhausted as e:
+        check_deadline(deadline, "driver checkout")
+        print(f"!!! {e} !!!")
+        return None
 
-        # Scrape SDE profiles
-        print(f"\n--- Searching for SDEs ---")
-        sde_profiles = scrape_google(driver, wait, sde_query, 5)
-        
-        # Scrape HR profiles if SDE search didn't fail
-        hr_profiles = []
-        if sde_profiles is not None:
-             time.sleep(5) # Increased delay to avoid rate limiting
-             print(f"\n--- Searching for HR ---")
-             hr_profiles = scrape_google(driver, wait, hr_query, 2)
-        else: # If the first search failed (e.g. CAPTCHA), don't try again
-             sde_profiles = []
+    # Backstop: if a WebDriver call is still blocked after the deadline, kill the driver
+    killed = threading.Event()
+    watchdog = None
+    if deadline is not None:
+        watchdog = deadline.watch(lambda: kill_driver(driver, killed), grace=DRIVER_KILL_GRACE)
 
-        return format_for_excel(company_name, "Completed", sde_profiles, hr_profiles)
+    started = time.monotonic()
+    try:
+        prepare_driver(driver)
+        wait = WebDriverWait(driver, 15)  # Increased timeout
+        return scrape_google(driver, wait, query, max_results, deadline)
+    except (DeadlineExceeded, engines.EngineOverloaded, ScrapeError):
+        raise
+    except Exception as e:
+        if killed.is_set():
+            raise DeadlineExceeded("google") from e
+        artifact_id = capture_failure(
+            driver, "google_error",
+            query=query,
+            error=str(e),
+            error_type=type(e).__name__,
+            elapsed_seconds=round(time.monotonic() - started, 3),
+            deadline_remaining=round(deadline.remaining(), 3) if deadline is not None else None,
+        )
+        debug_info = f"Error: {str(e)[:300]}"
+        if artifact_id:
+            debug_info += f"\nArtifact: /artifacts/{artifact_id}"
+        raise ScrapeError(str(e), debug_info, artifact_id) from e
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+            # If the kill already started, let it finish before the pool retires the driver
+            watchdog.join()
+        pool.checkin(driver, broken=killed.is_set())
 
+def kill_driver(driver, killed):
+    """Kill chromedriver and the Chrome tree under a stuck command so it fails now instead of at its own timeout.
+
+    Returns once the processes are gone (or DRIVER_KILL_WAIT passes), so the
+    profile dir is not deleted under a still-running browser.
+    """
+    killed.set()
+    print("!!! Deadline passed with the driver still busy, killing it !!!")
+    metrics.TIMEOUTS.inc(stage="driver_kill")
+    try:
+        if not kill_process_tree(driver.service.process.pid, timeout=DRIVER_KILL_WAIT):
+            print("!!! Chrome processes still running after the kill !!!")
     except Exception as e:
-        print(f"!!! Error in scrape_with_selenium: {e} !!!")
-        # Enhanced debugging
-        page_source_for_debug = ""
-        current_url = ""
-        if driver:
-            try:
-                current_url = driver.current_url
-                page_source_for_debug = driver.page_source[:5000]
-            except:
-                pass
+        print(f"Could not kill chromedriver: {e}")
 
-        debug_info = f"Error: {str(e)}\nCurrent URL: {current_url}\nPage source: {page_source_for_debug}"
-        return create_empty_result(company_name, "Scraping Error", debug_info)
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+def prepare_driver(driver):
+    """Apply the stealth tweaks to the driver's current page before a search."""
+    # Additional stealth measures - more comprehensive
+    # driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
+    driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
+    
+    driver.execute_script("""
+        window.navigator.chrome = {
+            runtime: {},
+        };
+    """)
+    
+    driver.execute_script("""
+        Object.defineProperty(navigator, 'permissions', {
+            get: () => ({
+                query: () => Promise.resolve({ state: 'granted' }),
+            }),
+        });
+    """)
+    
+    # Set realistic screen properties
+    driver.execute_script("""
+        Object.defineProperty(window, 'outerHeight', {
+            get: () => 1080,
+        });
+        Object.defineProperty(window, 'outerWidth', {
+            get: () => 1920,
+        });
+    """)
 
-def scrape_google(driver, wait, query, max_results):
+def scrape_google(driver, wait, query, max_results, deadline=None):
     """Performs a single Google search and returns found profiles with CAPTCHA handling."""
     try:
-        # Add random delay to seem more human-like
-        import random
-        time.sleep(random.uniform(2, 5))
-        
-        search_url = f"https://www.google.com/search?q={urllib.parse.quote(query)}&gl=us&hl=en"
+        search_url = f"{GOOGLE_BASE_URL}/search?q={urllib.parse.quote(query)}&gl=us&hl=en"
+        # Pacing between searches comes from the shared per-host throttle
+        host_throttle.wait(search_url, deadline)
+        navigate(driver, search_url, deadline)
+        blocking = resource_blocker.before_navigation(driver)
         print(f"Navigating to: {search_url}")
+        started = time.monotonic()
         driver.get(search_url)
         
-        # Wait a bit for the page to load
-        time.sleep(random.uniform(3, 6))
+        # Wait until results or a block page render, not a fixed delay
+        waits.wait_for_results_page(driver, deadline=deadline)
+        load_seconds = time.monotonic() - started
+        metrics.PAGE_LOAD_SECONDS.observe(load_seconds, engine="google", blocking=blocking)
+        resource_blocker.record(driver, blocking, load_seconds)
 
         # Check for CAPTCHA/blocking page
         page_text = driver.page_source.lower()
@@ -291,101 +1203,130 @@ def scrape_google(driver, wait, query, max_results):
         
         if any(keyword in page_text for keyword in captcha_keywords):
             print("!!! CAPTCHA or block page detected !!!")
+            metrics.BLOCK_PAGES.inc(engine="google")
+            capture_failure(driver, "google_block_page", query=query,
+                            keywords=[keyword for keyword in captcha_keywords if keyword in page_text])
             
             # Try to handle CAPTCHA automatically
-            if handle_captcha_page(driver, wait):
+            if handle_captcha_page(driver, wait, deadline):
                 print("✓ CAPTCHA handling attempted, retrying search...")
-                time.sleep(20)
+                waits.wait_until(driver, waits.no_element_present(waits.BLOCK_SELECTORS),
+                                 waits.BLOCK_CLEAR_TIMEOUT, "block_clear", deadline)
                 # Retry the search after handling CAPTCHA
+                host_throttle.wait(search_url, deadline)
+                navigate(driver, search_url, deadline)
                 driver.get(search_url)
-                time.sleep(5)
+                waits.wait_for_results_page(driver, deadline=deadline)
                 page_text = driver.page_source.lower()
                 
                 # Check again if CAPTCHA is still there
                 if any(keyword in page_text for keyword in captcha_keywords):
-                    print("!!! CAPTCHA still present, switching to alternative search method !!!")
-                    return search_alternative_method(query, max_results)
+                    print("!!! CAPTCHA still present, moving on to the next search engine !!!")
+                    raise engines.EngineOverloaded("google")
             else:
-                print("!!! Could not handle CAPTCHA, switching to alternative method !!!")
-                return search_alternative_method(query, max_results)
+                print("!!! Could not handle CAPTCHA, moving on to the next search engine !!!")
+                raise engines.EngineOverloaded("google")
 
-        # Wait for search results container to be present
-        try:
-            wait.until(EC.presence_of_element_located((By.ID, "search")))
-        except:
-            print("Search container not found, trying alternative approach...")
-            time.sleep(3)
+        # Wait for any of the known result containers to be present
+        if not waits.wait_until(driver, waits.any_element_present(extract.RESULT_SELECTORS),
+                                waits.RESULTS_TIMEOUT, "results", deadline):
+            print("Search results not found, trying all selectors anyway...")
         
-        # Multiple selectors to try
-        selectors = [
-            "div.yuRUbf",          # Primary selector
-            "div.g",               # Fallback selector
-            "div[data-ved]",       # Alternative selector
-            ".rc"                  # Old style selector
-        ]
+        started = time.monotonic()
+        if EXTRACTION_MODE == 'script':
+            payload = driver.execute_script(extract.GOOGLE_RESULTS_SCRIPT, extract.RESULT_SELECTORS)
+            profiles = extract.google_script_results(payload, max_results)
+        elif EXTRACTION_MODE == 'webdriver':
+            profiles = extract_with_webdriver(driver, max_results)
+        else:
+            profiles = extract.parse_google_results(driver.page_source, max_results, driver.current_url)
+        elapsed = time.monotonic() - started
+        metrics.EXTRACTION_SECONDS.observe(elapsed, mode=EXTRACTION_MODE)
+        print(f"Extracted {len(profiles)} profiles in {elapsed:.3f}s ({EXTRACTION_MODE})")
+
+        if not profiles:
+            print("No search results found with any selector")
+        for profile in profiles:
+            print(f"  -> Found: {profile}")
         
-        search_results = []
-        for selector in selectors:
-            search_results = driver.find_elements(By.CSS_SELECTOR, selector)
-            if search_results:
-                print(f"Found {len(search_results)} results with selector: {selector}")
-                break
+        return profiles
         
-        if not search_results:
-            print("No search results found with any selector")
-            return []
+    except (DeadlineExceeded, engines.EngineOverloaded):
+        raise
+    except Exception as e:
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceeded("google") from e
+        print(f"!!! Failed to scrape query '{query}'. Error: {e} !!!")
+        # Captured here, while the driver still shows the page that broke the scrape
+        artifact_id = capture_failure(driver, "google_error", query=query, error=str(e),
+                                      error_type=type(e).__name__)
+        debug_info = f"Error: {str(e)[:300]}"
+        if artifact_id:
+            debug_info += f"\nArtifact: /artifacts/{artifact_id}"
+        raise ScrapeError(str(e), debug_info, artifact_id) from e
 
-        profiles = []
-        for result in search_results:
-            if len(profiles) >= max_results:
-                break
+def extract_with_webdriver(driver, max_results):
+    """Legacy extraction through per-element WebDriver calls (one round-trip per lookup)."""
+    search_results = []
+    for selector in extract.RESULT_SELECTORS:
+        search_results = driver.find_elements(By.CSS_SELECTOR, selector)
+        if search_results:
+            print(f"Found {len(search_results)} results with selector: {selector}")
+            break
+
+    profiles = []
+    seen = set()
+    for result in search_results:
+        if len(profiles) >= max_results:
+            break
+        try:
+            # Try multiple approaches to find the link and title
+            link_element = None
+            name = ""
+            url = ""
+            
+            # Method 1: Direct anchor tag
             try:
-                # Try multiple approaches to find the link and title
-                link_element = None
-                name = ""
-                url = ""
-                
-                # Method 1: Direct anchor tag
+                link_element = result.find_element(By.TAG_NAME, 'a')
+                url = link_element.get_attribute('href')
+            except:
+                pass
+            
+            # Method 2: Try h3 parent approach
+            if not url:
                 try:
-                    link_element = result.find_element(By.TAG_NAME, 'a')
+                    h3_element = result.find_element(By.TAG_NAME, 'h3')
+                    link_element = h3_element.find_element(By.XPATH, '..')
                     url = link_element.get_attribute('href')
                 except:
                     pass
-                
-                # Method 2: Try h3 parent approach
-                if not url:
-                    try:
-                        h3_element = result.find_element(By.TAG_NAME, 'h3')
-                        link_element = h3_element.find_element(By.XPATH, '..')
-                        url = link_element.get_attribute('href')
-                    except:
-                        pass
-                
-                # Get the name/title
+            
+            # Get the name/title
+            try:
+                name = result.find_element(By.TAG_NAME, 'h3').text
+            except:
                 try:
-                    name = result.find_element(By.TAG_NAME, 'h3').text
+                    name = result.find_element(By.CSS_SELECTOR, 'h3, .LC20lb').text
                 except:
-                    try:
-                        name = result.find_element(By.CSS_SELECTOR, 'h3, .LC20lb').text
-                    except:
-                        name = "Unknown"
+                    name = "Unknown"
+            
+            url = extract.canonical_profile_url(url)
+            if url and url not in seen:
+                seen.add(url)
+                profiles.append({"name": name.strip(), "url": url})
                 
-                if url and 'linkedin.com/in/' in url:
-                    profile = {"name": name.strip(), "url": url}
-                    profiles.append(profile)
-                    print(f"  -> Found: {profile}")
-                    
-            except Exception as e:
-                print(f"Error processing result: {e}")
-                continue
-        
-        return profiles
-        
-    except Exception as e:
-        print(f"!!! Failed to scrape query '{query}'. Error: {e} !!!")
-        return None
+        except Exception as e:
+            print(f"Error processing result: {e}")
+            continue
+    
+    return profiles
 
-def handle_captcha_page(driver, wait):
+def navigate(driver, url, deadline):
+    """Get ready to load `url`: stop if the deadline passed, else cap the page load at what's left."""
+    check_deadline(deadline, "google")
+    driver.set_page_load_timeout(max(1, clamp_timeout(deadline, SCRAPE_TIMEOUT)))
+
+def handle_captcha_page(driver, wait, deadline=None):
     """
     A more robust attempt to handle a CAPTCHA page by looking inside iframes.
 
@@ -397,27 +1338,33 @@ def handle_captcha_page(driver, wait):
         print("Attempting to handle CAPTCHA page with iframe search...")
         
         # CAPTCHAs are almost always in an iframe. We need to switch to it first.
-        # This waits up to 10 seconds for an iframe with 'recaptcha' or 'hcaptcha' in its source.
-        short_wait = WebDriverWait(driver, 20)
+        # This waits for an iframe with 'recaptcha' or 'hcaptcha' in its source.
         iframe_locator = (By.XPATH, "//iframe[contains(@src, 'recaptcha') or contains(@src, 'hcaptcha')]")
         
-        try:
-            short_wait.until(EC.frame_to_be_available_and_switch_to_it(iframe_locator))
-            print("✓ Switched to CAPTCHA iframe.")
-        except Exception:
+        if not waits.wait_until(driver, EC.frame_to_be_available_and_switch_to_it(iframe_locator),
+                                waits.AFTER_CLICK_TIMEOUT, "captcha_iframe", deadline):
             print("!!! Could not find a CAPTCHA iframe. The block may be a simple page.")
             # Fallback to just pressing enter on the page if no iframe is found
-            driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ENTER)
-            time.sleep(5)
+            body = driver.find_element(By.TAG_NAME, 'body')
+            body.send_keys(Keys.ENTER)
+            waits.wait_until(driver, EC.staleness_of(body), waits.AFTER_CLICK_TIMEOUT, "captcha_enter", deadline)
             return True
+        print("✓ Switched to CAPTCHA iframe.")
 
         # Now inside the iframe, try to click the checkbox.
         checkbox_locator = (By.CSS_SELECTOR, "div.recaptcha-checkbox-border")
         try:
-            checkbox = short_wait.until(EC.element_to_be_clickable(checkbox_locator))
+            checkbox = WebDriverWait(driver, max(0.1, clamp_timeout(deadline, waits.AFTER_CLICK_TIMEOUT))).until(
+                EC.element_to_be_clickable(checkbox_locator))
             print("Found CAPTCHA checkbox, clicking...")
             checkbox.click()
-            time.sleep(5)
+            waits.wait_until(
+                driver,
+                lambda d: d.find_element(By.ID, 'recaptcha-anchor').get_attribute('aria-checked') == 'true',
+                waits.AFTER_CLICK_TIMEOUT,
+                "captcha_checkbox",
+                deadline,
+            )
         except Exception:
             print("!!! Could not find or click the checkbox inside the iframe.")
             # Switch back to the main page before failing
@@ -429,7 +1376,8 @@ def handle_captcha_page(driver, wait):
         print("✓ Switched back to main content.")
         
         # Give it a moment to see if the puzzle was solved or a new one appeared
-        time.sleep(5)
+        waits.wait_until(driver, waits.any_element_present(extract.RESULT_SELECTORS),
+                         waits.AFTER_CLICK_TIMEOUT, "captcha_solved", deadline)
         return True
 
     except Exception as e:
@@ -441,115 +1389,29 @@ def handle_captcha_page(driver, wait):
             pass
         return False
     
-def search_alternative_method(query, max_results):
-    """Alternative search method using different search engines"""
-    print("Using alternative search method...")
-    
-    # Method 1: Try DuckDuckGo with requests (no Selenium needed)
-    try:
-        import requests
-        from bs4 import BeautifulSoup
-        
-        print("Trying DuckDuckGo via requests...")
-        search_url = f"https://duckduckgo.com/html/?q={urllib.parse.quote(query)}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-        
-        response = requests.get(search_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            results = soup.find_all('a', class_='result__a')
-            
-            profiles = []
-            for result in results[:max_results * 2]:
-                try:
-                    url = result.get('href')
-                    name = result.get_text(strip=True)
-                    
-                    if url and 'linkedin.com/in/' in url and len(profiles) < max_results:
-                        profiles.append({"name": name, "url": url})
-                        print(f"  -> Found via DuckDuckGo: {name}")
-                except:
-                    continue
-            
-            if profiles:
-                return profiles
-                
-    except Exception as e:
-        print(f"DuckDuckGo requests method failed: {e}")
-    
-    # Method 2: Try Bing with requests
-    try:
-        print("Trying Bing via requests...")
-        search_url = f"https://www.bing.com/search?q={urllib.parse.quote(query)}"
-        
-        response = requests.get(search_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            results = soup.find_all('h2')
-            
-            profiles = []
-            for result in results[:max_results * 2]:
-                try:
-                    link = result.find('a')
-                    if link:
-                        url = link.get('href')
-                        name = link.get_text(strip=True)
-                        
-                        if url and 'linkedin.com/in/' in url and len(profiles) < max_results:
-                            profiles.append({"name": name, "url": url})
-                            print(f"  -> Found via Bing: {name}")
-                except:
-                    continue
-            
-            if profiles:
-                return profiles
-                
-    except Exception as e:
-        print(f"Bing requests method failed: {e}")
-    
-    print("All alternative search methods failed")
-    return []
-
-def create_empty_result(company_name, status, debug_info=""):
+def create_empty_result(company_name, status, debug_info="", artifact_id=None):
     """Creates a standardized empty/error result, including debug info."""
-    return {
-        "excel_data": [{
-            "Company Name": company_name,
-            "Status": status,
-            **{f"SDE {i} Name": "" for i in range(1, 6)},
-            **{f"SDE {i} URL": "" for i in range(1, 6)},
-            **{f"HR {i} Name": "" for i in range(1, 3)},
-            **{f"HR {i} URL": "" for i in range(1, 3)}
-        }],
-        "debug_info": debug_info
-    }
-
-def format_for_excel(company_name, status, sde_profiles, hr_profiles):
-    """Formats the final data into the structure n8n expects."""
-    row = {
-        "Company Name": company_name,
-        "Status": status,
-        **{f"SDE {i} Name": "" for i in range(1, 6)},
-        **{f"SDE {i} URL": "" for i in range(1, 6)},
-        **{f"HR {i} Name": "" for i in range(1, 3)},
-        **{f"HR {i} URL": "" for i in range(1, 3)}
-    }
-
-    for i, profile in enumerate(sde_profiles[:5]):
-        row[f"SDE {i+1} Name"] = profile['name']
-        row[f"SDE {i+1} URL"] = profile['url']
-        
-    for i, profile in enumerate(hr_profiles[:2]):
-        row[f"HR {i+1} Name"] = profile['name']
-        row[f"HR {i+1} URL"] = profile['url']
-        
-    return {"excel_data": [row]}
+    result = format_for_excel(company_name, status, {})
+    result["debug_info"] = debug_info
+    if artifact_id:
+        result["artifact_id"] = artifact_id
+        result["artifact_url"] = f"/artifacts/{artifact_id}"
+    return result
+
+def format_for_excel(company_name, status, profiles):
+    """Formats the final data into the structure n8n expects: one wide row, TABLE_COLUMNS wide.
+
+    `profiles` maps role name to its profiles; missing roles and unused slots stay blank.
+    """
+    values = [company_name, status]
+    for role in ROLES:
+        found = (profiles.get(role.name) or [])[:role.slots]
+        padding = [""] * (role.slots - len(found))
+        values.extend([profile['name'] for profile in found] + padding)
+        values.extend([profile['url'] for profile in found] + padding)
+    return {"excel_data": [dict(zip(TABLE_COLUMNS, values))]}
 
 if __name__ == '__main__':
+    start_warm_up()
     port = int(os.environ.get('PORT', 5001))
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file
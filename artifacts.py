@@ -0,0 +1,126 @@
+import os
+import re
+import gzip
+import json
+import time
+import uuid
+import shutil
+import threading
+
+ARTIFACT_ID = re.compile(r"^\d{16}-[0-9a-f]{8}$")
+
+META_FILE = "meta.json"
+HTML_FILE = "page.html.gz"
+SCREENSHOT_FILE = "screenshot.png"
+
+
+class ArtifactStore:
+    """Failure captures (page HTML, screenshot, timings) on local disk, pruned by count, size and age.
+
+    Each capture is a directory named by its id; HTML is gzipped and the PNG
+    screenshot is stored as is. Ids start with a microsecond timestamp, so
+    sorting them sorts captures oldest first.
+    """
+
+    def __init__(self, root, max_count=200, max_bytes=100 * 2**20, max_age=3 * 86400):
+        self.root = root
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._saved = 0
+        self._pruned = 0
+
+    def save(self, kind, html=None, screenshot=None, details=None):
+        """Write one capture and return its id."""
+        artifact_id = f"{time.time_ns() // 1000:016d}-{uuid.uuid4().hex[:8]}"
+        directory = os.path.join(self.root, artifact_id)
+        os.makedirs(directory)
+        meta = {"id": artifact_id, "kind": kind, "created_at": time.time(), **(details or {})}
+        if html is not None:
+            with gzip.open(os.path.join(directory, HTML_FILE), "wt", encoding="utf-8", compresslevel=6) as f:
+                f.write(html)
+            meta["html_chars"] = len(html)
+        if screenshot is not None:
+            with open(os.path.join(directory, SCREENSHOT_FILE), "wb") as f:
+                f.write(screenshot)
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump(meta, f)
+        with self._lock:
+            self._saved += 1
+            self._prune()
+        return artifact_id
+
+    def meta(self, artifact_id):
+        """The capture's metadata plus which files it has, or None if it is unknown or expired."""
+        directory = self._directory(artifact_id)
+        if directory is None:
+            return None
+        try:
+            with open(os.path.join(directory, META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        meta["has_html"] = os.path.exists(os.path.join(directory, HTML_FILE))
+        meta["has_screenshot"] = os.path.exists(os.path.join(directory, SCREENSHOT_FILE))
+        return meta
+
+    def html_path(self, artifact_id):
+        return self._file(artifact_id, HTML_FILE)
+
+    def screenshot_path(self, artifact_id):
+        return self._file(artifact_id, SCREENSHOT_FILE)
+
+    def stats(self):
+        with self._lock:
+            entries = self._entries()
+            return {
+                "root": self.root,
+                "artifacts": len(entries),
+                "bytes": sum(size for _, size in entries),
+                "saved": self._saved,
+                "pruned": self._pruned,
+                "max_count": self.max_count,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+            }
+
+    def _directory(self, artifact_id):
+        if not ARTIFACT_ID.match(artifact_id or ""):
+            return None
+        directory = os.path.join(self.root, artifact_id)
+        return directory if os.path.isdir(directory) else None
+
+    def _file(self, artifact_id, name):
+        directory = self._directory(artifact_id)
+        if directory is None:
+            return None
+        path = os.path.join(directory, name)
+        return path if os.path.exists(path) else None
+
+    def _entries(self):
+        """(id, bytes) for every capture on disk, oldest first."""
+        try:
+            names = sorted(name for name in os.listdir(self.root) if ARTIFACT_ID.match(name))
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            directory = os.path.join(self.root, name)
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+            except OSError:
+                continue
+            entries.append((name, size))
+        return entries
+
+    def _prune(self):
+        entries = self._entries()
+        total = sum(size for _, size in entries)
+        cutoff = time.time() - self.max_age
+        while entries and (len(entries) > self.max_count or total > self.max_bytes
+                           or int(entries[0][0].split("-")[0]) / 1e6 < cutoff):
+            name, size = entries.pop(0)
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            total -= size
+            self._pruned += 1
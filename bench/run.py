@@ -0,0 +1,158 @@
+"""Offline benchmark: extraction speed, per-engine latency and /scrape throughput.
+
+Everything runs against recorded result pages served by bench.server, so the
+numbers are comparable between runs. Usage:
+
+    python -m bench.run --latency-ms 50 --concurrency 1,2,4,8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.server import StandInServer, FIXTURES_DIR
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def bench_extraction(iterations):
+    """Parse each recorded page `iterations` times and report pages/s and results/s."""
+    import extract
+
+    parsers = {
+        "google": lambda html: extract.parse_google_results(html, 10),
+        "duckduckgo": lambda html: extract.parse_duckduckgo_results(html, 10),
+        "bing": lambda html: extract.parse_bing_results(html, 10),
+    }
+    report = {"parser": extract.HTML_PARSER}
+    for name, parse in parsers.items():
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), "rb") as f:
+            html = f.read()
+        # The Google parser logs the selector it matched; keep the output readable
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            found = len(parse(html))
+            started = time.perf_counter()
+            for _ in range(iterations):
+                parse(html)
+            elapsed = time.perf_counter() - started
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        report[name] = {
+            "results_per_page": found,
+            "ms_per_page": round(elapsed / iterations * 1000, 3),
+            "pages_per_second": round(iterations / elapsed, 1),
+            "results_per_second": round(found * iterations / elapsed, 1),
+        }
+    return report
+
+
+def bench_engines(app, queries):
+    """Time each HTTP engine on its own against the stand-in server."""
+    import engines
+
+    report = {}
+    for name in engines.HTTP_ENGINES:
+        samples = []
+        for i in range(queries):
+            started = time.perf_counter()
+            engines.HTTP_ENGINES[name](f'site:linkedin.com/in/ "Bench {i}"', 5, app.host_throttle)
+            samples.append(time.perf_counter() - started)
+        report[name] = summarize(samples)
+    report["http_sessions"] = engines.session_stats()
+    return report
+
+
+def bench_scrape(app, levels, requests_per_level):
+    """POST /scrape with distinct companies at each concurrency level."""
+    report = {}
+    for level in levels:
+        def one(i):
+            client = app.app.test_client()
+            started = time.perf_counter()
+            response = client.post('/scrape', json={"company": f"Bench Co {level}-{i}"})
+            elapsed = time.perf_counter() - started
+            row = response.get_json()["excel_data"][0]
+            return elapsed, row["Status"]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            outcomes = list(pool.map(one, range(requests_per_level)))
+        wall = time.perf_counter() - started
+        latencies = [elapsed for elapsed, _ in outcomes]
+        report[str(level)] = {
+            **summarize(latencies),
+            "requests_per_second": round(requests_per_level / wall, 2),
+            "completed": sum(1 for _, status in outcomes if status == "Completed"),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50, help="stand-in server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated /scrape concurrency levels")
+    parser.add_argument("--requests", type=int, default=16, help="/scrape calls per concurrency level")
+    parser.add_argument("--extraction-iterations", type=int, default=200)
+    parser.add_argument("--engine-queries", type=int, default=20)
+    parser.add_argument("--engines", default="duckduckgo,bing",
+                        help="SEARCH_ENGINE_ORDER for the /scrape run; add 'google' only where Chrome is installed")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    server = StandInServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000).start()
+
+    # Configure the app before importing it: local engines, no pacing, no cache
+    os.environ.update(server.engine_env())
+    os.environ.update({
+        "SEARCH_ENGINE_ORDER": args.engines,
+        "SEARCH_HOST_DELAY": "0",
+        "SEARCH_HOST_BUDGET": "0",
+        "RESULT_CACHE_ENABLED": "0",
+        "JOB_WORKERS": str(max(levels)),
+        "JOB_QUEUE_SIZE": str(args.requests),
+        "SEARCH_QUERY_WORKERS": str(2 * max(levels)),
+    })
+    import app
+
+    stdout = sys.stdout
+    report = {"latency_ms": args.latency_ms, "extraction": bench_extraction(args.extraction_iterations)}
+    # The app logs every step; only the report goes to the terminal
+    sys.stdout = open(os.devnull, "w")
+    try:
+        report["engines"] = bench_engines(app, args.engine_queries)
+        report["scrape"] = bench_scrape(app, levels, args.requests)
+        report["stages"] = {"engines": app.engine_runner.stats(), "waits": app.waits.wait_stats()}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        server.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
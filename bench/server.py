@@ -0,0 +1,115 @@
+"""Local stand-in for the search engines, serving recorded result pages.
+
+Routes mirror the real engines under a per-engine prefix, so pointing
+GOOGLE_BASE_URL / DUCKDUCKGO_BASE_URL / BING_BASE_URL at
+http://127.0.0.1:<port>/<engine> makes the app search against it.
+"""
+import os
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ROUTES = {
+    "/google/search": "google.html",
+    "/duckduckgo/html/": "duckduckgo.html",
+    "/bing/search": "bing.html",
+}
+
+
+def load_fixtures():
+    pages = {}
+    for path, filename in ROUTES.items():
+        with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+            pages[path] = f.read()
+    return pages
+
+
+class StandInServer:
+    """Threaded HTTP server that answers each route with its fixture after `latency` (+/- `jitter`) seconds."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.pages = load_fixtures()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def engine_env(self):
+        """Environment variables that point every engine at this server."""
+        return {
+            "GOOGLE_BASE_URL": f"{self.base_url}/google",
+            "DUCKDUCKGO_BASE_URL": f"{self.base_url}/duckduckgo",
+            "BING_BASE_URL": f"{self.base_url}/bing",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                delay = server.latency + random.uniform(-server.jitter, server.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+                body = server.pages.get(self.path.split("?", 1)[0])
+                if body is None:
+                    body = b"not found"
+                    self.send_response(404)
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000).start()
+    print(f"Serving recorded search pages on {server.base_url}")
+    for key, value in server.engine_env().items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
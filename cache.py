@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+class ResultCache:
+    """SQLite-backed cache of search results with a TTL and LRU eviction.
+
+    Safe to share between threads, and between gunicorn workers pointing at the
+    same file; each process opens its own connection on first use.
+    """
+
+    def __init__(self, path, ttl=86400, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Return (value, age_seconds) for a fresh entry, or None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    conn.commit()
+                self._misses += 1
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._hits += 1
+            return json.loads(row[0]), now - row[1]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            # Drop expired rows first, then the least recently used beyond the cap
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {"entries": entries, "hits": self._hits, "misses": self._misses,
+                    "ttl": self.ttl, "max_entries": self.max_entries}
+
+    def _connect(self):
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key onto one in-flight execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run `fn()` once per key at a time; returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -0,0 +1,60 @@
+import time
+import threading
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a scrape runs out of time at `stage`."""
+
+    def __init__(self, stage):
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """An absolute point in time that a scrape and everything under it must finish by.
+
+    Passed down explicitly (it crosses executor threads), so each layer can
+    shrink its own timeouts to what is left and stop early once it has passed.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.at = time.monotonic() + seconds
+        self.cancelled = False
+
+    def remaining(self):
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.at
+
+    def clamp(self, timeout):
+        """The smaller of `timeout` and the time left."""
+        return min(timeout, self.remaining())
+
+    def check(self, stage):
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+    def cancel(self):
+        """Expire now, so work running against this deadline stops at its next check."""
+        self.cancelled = True
+        self.at = min(self.at, time.monotonic())
+
+    def watch(self, callback, grace=0.0):
+        """Call `callback` once the deadline (plus `grace`) passes; cancel the returned timer when done."""
+        timer = threading.Timer(self.remaining() + grace, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+def clamp(deadline, timeout):
+    """`timeout` shrunk to fit `deadline`, which may be None."""
+    return timeout if deadline is None else deadline.clamp(timeout)
+
+
+def check(deadline, stage):
+    if deadline is not None:
+        deadline.check(stage)
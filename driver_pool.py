@@ -0,0 +1,262 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+class DriverPoolExhausted(Exception):
+    """Raised when no driver could be checked out before the timeout."""
+
+
+class _PooledDriver:
+    """A driver plus the bookkeeping the pool needs to decide when to retire it."""
+
+    def __init__(self, driver, startup_seconds):
+        self.driver = driver
+        self.startup_seconds = startup_seconds
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Bounded pool of warm Chrome drivers that are checked out and back in.
+
+    Drivers are created lazily by `factory` up to `size`, health-checked on
+    checkout, and retired after `max_uses` checkouts, as soon as they break, or
+    when `should_retire(driver)` says so at checkin (e.g. over a memory limit).
+    """
+
+    def __init__(self, factory, size=1, max_uses=20, checkout_timeout=60, on_retire=None, should_retire=None):
+        self._factory = factory
+        self._on_retire = on_retire
+        self._should_retire = should_retire
+        self._size = max(1, size)
+        self._max_uses = max(1, max_uses)
+        self._checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle = []          # LIFO so the warmest driver is reused first
+        self._in_use = {}        # id(driver) -> _PooledDriver
+        self._starting = 0       # drivers currently being launched
+        self._sweeping = 0       # idle drivers pulled out for a retire check
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "retired_max_uses": 0,
+            "retired_unhealthy": 0,
+            "retired_over_limit": 0,
+            "checkouts": 0,
+            "checkout_wait_seconds": 0.0,
+            "startup_seconds_total": 0.0,
+        }
+
+    @property
+    def size(self):
+        return self._size
+
+    def checkout(self, timeout=None):
+        """Return a healthy driver, reusing an idle one or launching a new one."""
+        timeout = self._checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+
+        while True:
+            entry = None
+            launch = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise DriverPoolExhausted("Driver pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if len(self._in_use) + self._starting + self._sweeping < self._size:
+                        self._starting += 1
+                        launch = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolExhausted(
+                            f"No Chrome driver available after {timeout}s (pool size {self._size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if launch:
+                entry = self._launch()
+            elif not self._is_healthy(entry.driver):
+                print("!!! Pooled Chrome driver failed health check, replacing it !!!")
+                self._quit(entry.driver)
+                with self._cond:
+                    self._stats["retired_unhealthy"] += 1
+                    self._cond.notify()
+                continue
+            else:
+                with self._cond:
+                    self._stats["reused"] += 1
+
+            entry.uses += 1
+            with self._cond:
+                if launch:
+                    self._starting -= 1
+                self._in_use[id(entry.driver)] = entry
+                self._stats["checkouts"] += 1
+                self._stats["checkout_wait_seconds"] += time.monotonic() - started
+            return entry.driver
+
+    def checkin(self, driver, broken=False):
+        """Return a driver to the pool, retiring it if it is broken or worn out."""
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            self._quit(driver)
+            return
+
+        if not broken and not self._is_healthy(driver):
+            broken = True
+
+        over_limit = not broken and entry.uses < self._max_uses and self._check_retire(driver)
+        retire = broken or over_limit or entry.uses >= self._max_uses
+        with self._cond:
+            if self._closed:
+                retire = True
+            if retire:
+                if broken:
+                    self._stats["retired_unhealthy"] += 1
+                elif over_limit:
+                    self._stats["retired_over_limit"] += 1
+                elif entry.uses >= self._max_uses:
+                    self._stats["retired_max_uses"] += 1
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+
+        if retire:
+            print(f"Retiring Chrome driver after {entry.uses} uses (broken={broken})")
+            self._quit(driver)
+
+    def prewarm(self, count):
+        """Launch up to `count` drivers straight into the idle list; returns how many started."""
+        launched = 0
+        for _ in range(count):
+            with self._cond:
+                if self._closed or len(self._idle) + len(self._in_use) + self._starting + self._sweeping >= self._size:
+                    break
+                self._starting += 1
+            entry = self._launch()
+            with self._cond:
+                self._starting -= 1
+                self._idle.append(entry)
+                self._cond.notify()
+            launched += 1
+        return launched
+
+    def sweep_idle(self, predicate):
+        """Retire idle drivers for which `predicate(driver)` is true; returns how many went.
+
+        Busy drivers are left alone so a running scrape never loses its browser.
+        """
+        with self._cond:
+            candidates, self._idle = self._idle, []
+            self._sweeping += len(candidates)
+        keep, retire = [], []
+        for entry in candidates:
+            (retire if self._check_retire(entry.driver, predicate) else keep).append(entry)
+        with self._cond:
+            self._sweeping -= len(candidates)
+            if self._closed:
+                retire.extend(keep)
+            else:
+                # Anything checked in meanwhile is warmer; keep it on top of the LIFO
+                self._idle[:0] = keep
+            self._stats["retired_over_limit"] += len(retire)
+            self._cond.notify_all()
+        for entry in retire:
+            self._quit(entry.driver)
+        return len(retire)
+
+    def driver_ids(self):
+        """ids of every driver the pool currently owns, idle or checked out."""
+        with self._cond:
+            return [id(entry.driver) for entry in self._idle] + list(self._in_use)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager that checks a driver out and always checks it back in."""
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def close(self):
+        """Quit every idle driver and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry.driver)
+        if idle:
+            print(f"Closed {len(idle)} pooled Chrome driver(s)")
+
+    def stats(self):
+        """Snapshot of pool counters, including the startup time saved by reuse."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = len(self._in_use)
+            stats["starting"] = self._starting
+        created = stats["created"]
+        avg_startup = stats["startup_seconds_total"] / created if created else 0.0
+        stats["avg_startup_seconds"] = round(avg_startup, 3)
+        stats["startup_seconds_saved"] = round(avg_startup * stats["reused"], 3)
+        stats["startup_seconds_total"] = round(stats["startup_seconds_total"], 3)
+        stats["checkout_wait_seconds"] = round(stats["checkout_wait_seconds"], 3)
+        return stats
+
+    def _launch(self):
+        started = time.monotonic()
+        try:
+            driver = self._factory()
+        except BaseException:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._stats["created"] += 1
+            self._stats["startup_seconds_total"] += elapsed
+        print(f"✓ Launched pooled Chrome driver in {elapsed:.2f}s")
+        return _PooledDriver(driver, elapsed)
+
+    def _check_retire(self, driver, predicate=None):
+        predicate = predicate or self._should_retire
+        if predicate is None:
+            return False
+        try:
+            return bool(predicate(driver))
+        except Exception as e:
+            print(f"Driver retire check failed: {e}")
+            return False
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if self._on_retire is not None:
+            try:
+                self._on_retire(driver)
+            except Exception as e:
+                print(f"Driver retire hook failed: {e}")
@@ -0,0 +1,418 @@
+import os
+import math
+import time
+import threading
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import extract
+import metrics
+from deadline import Deadline, DeadlineExceeded, clamp, check
+
+# Connection pooling / retry policy shared by every HTTP engine. HTTP_POOL_SIZE is a
+# floor: an EngineRunner raises it to its own concurrency (see size_pools)
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 4))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+
+# Overridable so the engines can point at a local stand-in server (see bench/)
+DUCKDUCKGO_BASE_URL = os.environ.get('DUCKDUCKGO_BASE_URL', 'https://duckduckgo.com').rstrip('/')
+BING_BASE_URL = os.environ.get('BING_BASE_URL', 'https://www.bing.com').rstrip('/')
+
+# Latencies kept per engine for the p50/p95/p99 in EngineRunner.stats()
+LATENCY_WINDOW = int(os.environ.get('ENGINE_LATENCY_WINDOW', 500))
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+
+_sessions = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+_pool_size = HTTP_POOL_SIZE
+
+
+def size_pools(concurrency):
+    """Keep enough keep-alive connections per engine for `concurrency` simultaneous requests.
+
+    A smaller pool makes urllib3 drop connections ("Connection pool is full").
+    Applies to sessions created from now on.
+    """
+    global _pool_size
+    with _sessions_lock:
+        _pool_size = max(_pool_size, concurrency)
+
+
+def get_session(engine):
+    """Return the keep-alive session for `engine`, created once per process."""
+    global _sessions_pid
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        session = _sessions.get(engine)
+        if session is None:
+            session = _sessions[engine] = _build_session()
+        return session
+
+
+def _build_session():
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        # 429/503 mean "slow down": surfaced as EngineOverloaded for the scheduler to back off,
+        # rather than retried here straight away
+        status_forcelist=(500, 502, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=_pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session_stats():
+    """Requests vs. new connections per engine; the difference is keep-alive reuse."""
+    with _sessions_lock:
+        sessions = dict(_sessions) if _sessions_pid == os.getpid() else {}
+    stats = {}
+    for engine, session in sessions.items():
+        requests_made = connections = 0
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_made += pool.num_requests
+                    connections += pool.num_connections
+        stats[engine] = {
+            "requests": requests_made,
+            "connections": connections,
+            "reused": max(0, requests_made - connections),
+        }
+    return stats
+
+
+def search_duckduckgo(query, max_results, throttle=None, deadline=None):
+    """DuckDuckGo's HTML endpoint via requests (no Selenium needed)."""
+    search_url = f"{DUCKDUCKGO_BASE_URL}/html/?q={urllib.parse.quote(query)}"
+    return _fetch_and_parse("duckduckgo", search_url, extract.parse_duckduckgo_results, max_results,
+                            throttle, deadline)
+
+
+def search_bing(query, max_results, throttle=None, deadline=None):
+    """Bing's results page via requests."""
+    search_url = f"{BING_BASE_URL}/search?q={urllib.parse.quote(query)}"
+    return _fetch_and_parse("bing", search_url, extract.parse_bing_results, max_results, throttle, deadline)
+
+
+HTTP_ENGINES = {
+    "duckduckgo": search_duckduckgo,
+    "bing": search_bing,
+}
+
+
+class EngineOverloaded(Exception):
+    """An engine asked us to slow down (HTTP 429/503, a block page); `retry_after` is in seconds, if it said."""
+
+    def __init__(self, engine, retry_after=None):
+        super().__init__(f"{engine} is overloaded")
+        self.engine = engine
+        self.retry_after = retry_after
+
+
+# DuckDuckGo's HTML endpoint answers 202 with an "anomaly" page when it is rate limiting
+OVERLOAD_STATUSES = {"duckduckgo": (202, 429, 503)}
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _fetch_and_parse(engine, search_url, parse, max_results, throttle, deadline=None):
+    check(deadline, engine)
+    if throttle is not None:
+        throttle.wait(search_url, deadline)
+    timeout = (max(0.1, clamp(deadline, HTTP_CONNECT_TIMEOUT)), max(0.1, clamp(deadline, HTTP_READ_TIMEOUT)))
+    response = get_session(engine).get(search_url, timeout=timeout)
+    if response.status_code in OVERLOAD_STATUSES.get(engine, (429, 503)):
+        raise EngineOverloaded(engine, _retry_after(response))
+    if response.status_code != 200:
+        print(f"!!! {search_url} returned HTTP {response.status_code} !!!")
+        return None
+    return parse(response.content, max_results)
+
+
+class EngineRunner:
+    """Runs a query through the configured search engines and merges what they find.
+
+    Each engine is a callable `(query, max_results, deadline=None)` returning
+    a list of profiles, `[]` when the page had none, or None when the engine
+    failed (block page, HTTP error).
+
+    With a `hedge_delay` of 0 or more, engines are started in order on a
+    thread pool, each one `hedge_delay` seconds after the previous (or as soon
+    as it finishes without enough profiles). Results are merged and deduped,
+    and once `max_results` profiles are in, the engines still running are
+    cancelled through their deadline. A negative `hedge_delay` tries them one
+    at a time and stops at the first non-empty result.
+
+    Engines named in `browser_engines` are never hedged: they only run, one at
+    a time, once every other engine has come back empty or failed.
+
+    Hit rate, win rate (whose results came in first) and latency percentiles
+    are tracked per engine. With a `scheduler` (see scheduler.py) the order is
+    re-ranked per query from those stats, and engines raising EngineOverloaded
+    are benched instead of being retried straight away.
+    """
+
+    def __init__(self, engines, order, hedge_delay=-1, max_workers=4, default_timeout=240, scheduler=None,
+                 browser_engines=()):
+        unknown = [name for name in order if name not in engines]
+        if unknown:
+            raise ValueError(f"Unknown search engine(s): {', '.join(unknown)}")
+        self._engines = engines
+        self.order = list(order)
+        self.hedge_delay = hedge_delay
+        self.default_timeout = default_timeout
+        self.scheduler = scheduler
+        self.browser_engines = frozenset(browser_engines)
+        # Every executor thread may be in the same HTTP engine at once
+        size_pools(max_workers)
+        self._max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self._stats = {name: {"attempts": 0, "hits": 0, "empty": 0, "errors": 0, "timeouts": 0, "cancelled": 0,
+                              "overloaded": 0, "wins": 0, "total_seconds": 0.0, "latencies": deque(maxlen=LATENCY_WINDOW)}
+                       for name in engines}
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results, order=None, deadline=None, known=()):
+        """Return profiles for `query`, `[]` if every engine that answered came back empty.
+
+        Engine errors are logged and skipped; the first one is only re-raised
+        when no engine answered at all.
+
+        Raises EngineOverloaded without trying anything when the scheduler has
+        every engine in backoff.
+
+        `known` holds canonical URLs confirmed by earlier runs: once any engine
+        has answered, they count towards `max_results` when deciding to stop.
+        """
+        if order is None:
+            order = self.scheduler.order(self.order) if self.scheduler is not None else self.order
+            if not order:
+                # Not an empty answer: callers report Busy with a Retry-After instead of "no profiles"
+                print("!!! Every search engine is backing off, skipping the search !!!")
+                raise EngineOverloaded("every search engine", self.scheduler.retry_after(self.order))
+        # Browsers are the expensive last resort, whatever the configured or learned order says
+        fallback = [name for name in order if name in self.browser_engines]
+        order = [name for name in order if name not in self.browser_engines]
+        if self.hedge_delay < 0:
+            return self._search_sequential(query, max_results, order + fallback, deadline)
+        return self._search_hedged(query, max_results, order, fallback, deadline, set(known))
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for name, entry in self._stats.items():
+                attempts = entry["attempts"]
+                latencies = sorted(entry["latencies"])
+                stats[name] = {
+                    "attempts": attempts,
+                    "hits": entry["hits"],
+                    "empty": entry["empty"],
+                    "errors": entry["errors"],
+                    "timeouts": entry["timeouts"],
+                    "cancelled": entry["cancelled"],
+                    "overloaded": entry["overloaded"],
+                    "wins": entry["wins"],
+                    "hit_rate": round(entry["hits"] / attempts, 3) if attempts else None,
+                    "win_rate": round(entry["wins"] / attempts, 3) if attempts else None,
+                    "avg_seconds": round(entry["total_seconds"] / attempts, 3) if attempts else None,
+                    "p50_seconds": _percentile(latencies, 0.5),
+                    "p95_seconds": _percentile(latencies, 0.95),
+                    "p99_seconds": _percentile(latencies, 0.99),
+                }
+            return stats
+
+    def _search_sequential(self, query, max_results, order, deadline):
+        first_error = None
+        answered = False
+        for name in order:
+            check(deadline, "engines")
+            print(f"Trying {name}...")
+            try:
+                profiles = self._call(name, query, max_results, deadline)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                first_error = first_error or e
+                continue
+            answered = answered or profiles is not None
+            if profiles:
+                self._win(name)
+                return profiles
+        if first_error is not None and not answered:
+            raise first_error
+        print("All search engines came back empty")
+        return []
+
+    def _search_hedged(self, query, max_results, order, fallback, deadline, known):
+        # Every engine runs against a child deadline we can cancel once we have enough
+        scope = Deadline(deadline.remaining() if deadline is not None else self.default_timeout)
+        executor = self._get_executor()
+        waiting = list(order)
+        running = {}
+        merged = []
+        seen = set()
+        first_error = None
+        answered = False
+        winner = None
+        next_start = time.monotonic()
+        try:
+            while waiting or running:
+                scope.check("engines")
+                now = time.monotonic()
+                if waiting and (not running or now >= next_start):
+                    name = waiting.pop(0)
+                    print(f"Trying {name}...")
+                    running[executor.submit(self._call, name, query, max_results, scope)] = name
+                    next_start = now + self.hedge_delay
+                    continue
+
+                timeout = scope.remaining()
+                if waiting:
+                    timeout = min(timeout, max(0.0, next_start - now))
+                done, _ = wait_futures(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        profiles = future.result()
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        first_error = first_error or e
+                        continue
+                    answered = answered or profiles is not None
+                    if not profiles:
+                        continue
+                    if winner is None:
+                        winner = name
+                        self._win(name)
+                    # Parsers hand back canonical URLs, so the same profile from two engines matches
+                    for profile in profiles:
+                        if profile["url"] not in seen:
+                            seen.add(profile["url"])
+                            merged.append(profile)
+                    if len(merged) + len(known - seen) >= max_results:
+                        if running or waiting:
+                            print(f"Have {max_results} new or known profiles, "
+                                  f"cancelling {len(running) + len(waiting)} other engine(s)")
+                        return merged[:max_results]
+                if done:
+                    # An engine finished short of max_results; don't wait out the hedge delay
+                    next_start = min(next_start, time.monotonic())
+
+            if not merged:
+                for name in fallback:
+                    scope.check("engines")
+                    print(f"Trying {name}...")
+                    try:
+                        profiles = self._call(name, query, max_results, scope)
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        first_error = first_error or e
+                        continue
+                    answered = answered or profiles is not None
+                    if profiles:
+                        self._win(name)
+                        return profiles[:max_results]
+        finally:
+            # Only a scope that is still live is a cancellation; one that ran out is a timeout
+            # for whatever is still running, and _call records it as such
+            if not scope.expired:
+                scope.cancel()
+            for future, name in running.items():
+                if future.cancel():
+                    self._record(name, "cancelled", 0.0)
+
+        if merged:
+            return merged
+        if first_error is not None and not answered:
+            raise first_error
+        print("All search engines came back empty")
+        return []
+
+    def _call(self, name, query, max_results, deadline):
+        started = time.monotonic()
+        try:
+            profiles = self._engines[name](query, max_results, deadline=deadline)
+        except DeadlineExceeded:
+            cancelled = getattr(deadline, "cancelled", False)
+            self._record(name, "cancelled" if cancelled else "timeouts", time.monotonic() - started)
+            raise
+        except EngineOverloaded as e:
+            # Benched for later queries; for this one it just failed, like any other engine error
+            self._record(name, "overloaded", time.monotonic() - started)
+            if self.scheduler is not None:
+                self.scheduler.overloaded(name, e.retry_after)
+            return None
+        except Exception as e:
+            print(f"{name} search failed: {e}")
+            self._record(name, "errors", time.monotonic() - started)
+            raise
+        outcome = "hits" if profiles else ("empty" if profiles is not None else "errors")
+        self._record(name, outcome, time.monotonic() - started)
+        for profile in profiles or []:
+            print(f"  -> Found via {name}: {profile['name']}")
+        return profiles
+
+    def _get_executor(self):
+        # Per-PID like the other pools: executor threads don't survive a fork
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="engine")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _win(self, name):
+        metrics.ENGINE_WINS.inc(engine=name)
+        with self._lock:
+            self._stats[name]["wins"] += 1
+
+    def _record(self, name, outcome, seconds):
+        metrics.ENGINE_SECONDS.observe(seconds, engine=name, outcome=outcome)
+        with self._lock:
+            entry = self._stats[name]
+            entry["attempts"] += 1
+            entry[outcome] += 1
+            if outcome not in ("cancelled", "overloaded"):
+                entry["total_seconds"] += seconds
+                entry["latencies"].append(seconds)
+        if self.scheduler is not None:
+            self.scheduler.record(name, outcome, seconds)
+
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list, or None if it is empty."""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return round(values[index], 3)
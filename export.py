@@ -0,0 +1,49 @@
+import io
+import csv
+import tempfile
+
+try:
+    from openpyxl import Workbook
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def table_row(header, index, result):
+    """One output row: the input position, then the result's wide-table values in `header` order."""
+    row = result["excel_data"][0]
+    return (index, *(row.get(name, "") for name in header))
+
+
+def stream_csv(header, results):
+    """CSV text, one row per yielded string as each company finishes, led by an Index column for the input position."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Index"] + header)
+    yield buffer.getvalue()
+    for index, result in results:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(table_row(header, index, result))
+        yield buffer.getvalue()
+
+
+def stream_xlsx(header, results, sheet_title="Profiles"):
+    """An .xlsx workbook built in openpyxl's write-only mode, then streamed from a temp file."""
+    if not XLSX_AVAILABLE:
+        raise RuntimeError("XLSX export needs the openpyxl package")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(["Index"] + header)
+    for index, result in results:
+        sheet.append(table_row(header, index, result))
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            block = f.read(64 * 1024)
+            if not block:
+                break
+            yield block
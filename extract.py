@@ -0,0 +1,159 @@
+import re
+import base64
+import urllib.parse
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Known Google result containers, most specific first
+RESULT_SELECTORS = [
+    "div.yuRUbf",          # Primary selector
+    "div.g",               # Fallback selector
+    "div[data-ved]",       # Alternative selector
+    ".rc"                  # Old style selector
+]
+
+# Single round-trip alternative to page_source: the same container/anchor/title
+# lookup done in the browser, returned as JSON
+GOOGLE_RESULTS_SCRIPT = """
+const selectors = arguments[0];
+for (const selector of selectors) {
+    const containers = document.querySelectorAll(selector);
+    if (!containers.length) continue;
+    return {selector: selector, results: Array.from(containers, (el) => {
+        let link = el.querySelector('a[href]');
+        const h3 = el.querySelector('h3') || el.querySelector('.LC20lb');
+        if (!link && h3 && h3.parentElement && h3.parentElement.href) link = h3.parentElement;
+        return {url: link ? link.href : '', name: h3 ? h3.innerText : ''};
+    })};
+}
+return {selector: null, results: []};
+"""
+
+
+def make_soup(html):
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def unwrap_redirect(url):
+    """Follow search-engine click-tracking links (Google /url, DuckDuckGo /l/, Bing /ck/a) to their target."""
+    for _ in range(3):
+        parsed = urllib.parse.urlparse(url)
+        query = urllib.parse.parse_qs(parsed.query)
+        host = parsed.netloc.lower()
+        if parsed.path == "/url" and ("q" in query or "url" in query):
+            url = (query.get("q") or query["url"])[0]
+        elif "duckduckgo.com" in host and parsed.path.startswith("/l/") and "uddg" in query:
+            url = query["uddg"][0]
+        elif "bing.com" in host and parsed.path.startswith("/ck/a") and query.get("u", [""])[0].startswith("a1"):
+            encoded = query["u"][0][2:]
+            try:
+                url = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+            except (ValueError, UnicodeDecodeError):
+                return url
+        else:
+            return url
+    return url
+
+
+_PROFILE_PATH = re.compile(r"^/in/([^/?#]+)")
+
+
+def profile_slug(url):
+    """The public profile id in a LinkedIn /in/ URL (after unwrapping redirects), or None."""
+    if not url:
+        return None
+    parsed = urllib.parse.urlparse(unwrap_redirect(url.strip()))
+    host = parsed.netloc.lower().split(":")[0]
+    if not (host == "linkedin.com" or host.endswith(".linkedin.com")):
+        return None
+    match = _PROFILE_PATH.match(parsed.path)
+    if not match:
+        return None
+    slug = urllib.parse.unquote(match.group(1)).strip().lower()
+    return slug or None
+
+
+def canonical_profile_url(url):
+    """One spelling per profile: https://www.linkedin.com/in/<slug>, whatever redirect, subdomain or query it came with."""
+    slug = profile_slug(url)
+    if slug is None:
+        return None
+    return f"https://www.linkedin.com/in/{urllib.parse.quote(slug, safe='-_.~')}"
+
+
+def is_profile_url(url):
+    return profile_slug(url) is not None
+
+
+def collect_profiles(candidates, max_results):
+    """Keep the first `max_results` distinct LinkedIn profiles from (name, url) candidates, with canonical URLs."""
+    profiles = []
+    seen = set()
+    for name, url in candidates:
+        if len(profiles) >= max_results:
+            break
+        url = canonical_profile_url(url)
+        if url and url not in seen:
+            seen.add(url)
+            profiles.append({"name": (name or "Unknown").strip(), "url": url})
+    return profiles
+
+
+def parse_google_results(html, max_results, base_url="https://www.google.com/"):
+    """Extract profiles from a Google results page snapshot."""
+    soup = make_soup(html)
+    containers = []
+    for selector in RESULT_SELECTORS:
+        containers = soup.select(selector)
+        if containers:
+            print(f"Found {len(containers)} results with selector: {selector}")
+            break
+    return collect_profiles(_google_candidates(containers, base_url), max_results)
+
+
+def google_script_results(payload, max_results):
+    """Extract profiles from the JSON returned by GOOGLE_RESULTS_SCRIPT."""
+    payload = payload or {}
+    results = payload.get("results") or []
+    if payload.get("selector"):
+        print(f"Found {len(results)} results with selector: {payload['selector']}")
+    return collect_profiles(((r.get("name"), r.get("url")) for r in results), max_results)
+
+
+def parse_duckduckgo_results(html, max_results):
+    """Extract profiles from a DuckDuckGo HTML results page."""
+    soup = make_soup(html)
+    results = soup.find_all('a', class_='result__a')
+    candidates = ((a.get_text(strip=True), a.get('href')) for a in results)
+    return collect_profiles(candidates, max_results)
+
+
+def parse_bing_results(html, max_results):
+    """Extract profiles from a Bing results page."""
+    soup = make_soup(html)
+    results = soup.find_all('h2')
+    links = (result.find('a') for result in results)
+    candidates = ((link.get_text(strip=True), link.get('href')) for link in links if link)
+    return collect_profiles(candidates, max_results)
+
+
+def _google_candidates(containers, base_url):
+    for container in containers:
+        url = ""
+        # Method 1: Direct anchor tag
+        link = container.find('a', href=True)
+        if link:
+            url = link['href']
+        # Method 2: Try h3 parent approach
+        h3 = container.find('h3') or container.select_one('.LC20lb')
+        if not url and h3 is not None and h3.parent is not None:
+            url = h3.parent.get('href') or ""
+        if url:
+            url = urllib.parse.urljoin(base_url, url)
+        name = h3.get_text(strip=True) if h3 is not None else "Unknown"
+        yield name, url
@@ -0,0 +1,13 @@
+# Picked up automatically by gunicorn from the working directory.
+# With --preload the app is imported once in the master, so anything that owns
+# threads or browsers has to start in each worker after the fork.
+
+
+def post_fork(server, worker):
+    from app import start_warm_up
+    start_warm_up()
+
+
+def worker_exit(server, worker):
+    from app import shutdown_driver_pool
+    shutdown_driver_pool()
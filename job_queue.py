@@ -0,0 +1,419 @@
+import os
+import json
+import math
+import time
+import uuid
+import sqlite3
+import threading
+from urllib.parse import urlparse
+from jobs import JobQueueFull, QUEUED, RUNNING, DONE, FAILED
+
+
+class RemoteJob:
+    """A queued job seen from the API side; state is re-read from the queue on demand.
+
+    Mirrors `jobs.Job` (wait, wait_for_change, to_dict) so routes don't care
+    whether a scrape runs in-process or in a separate worker.
+    """
+
+    def __init__(self, queue, record):
+        self._queue = queue
+        self._record = record
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["_record"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def finished(self):
+        return self._record["status"] in (DONE, FAILED)
+
+    def refresh(self):
+        record = self._queue.record(self.id)
+        if record is not None:
+            self._record = record
+        return self
+
+    def wait(self, timeout=None):
+        """Poll until the job finishes; returns True if it did within `timeout`."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self.refresh().finished:
+            remaining = None if end is None else end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            time.sleep(self._queue.poll_interval if remaining is None else min(self._queue.poll_interval, remaining))
+        return True
+
+    def wait_for_change(self, version, timeout=None):
+        """Poll until the job's version moves past `version`; returns the current version."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.refresh().version == version:
+            if end is not None and time.monotonic() >= end:
+                break
+            time.sleep(self._queue.poll_interval)
+        return self.version
+
+    def to_dict(self):
+        record = self._record
+        data = {
+            "job_id": record["id"],
+            "status": record["status"],
+            **record["meta"],
+            "created_at": record["created_at"],
+            "started_at": record["started_at"],
+            "finished_at": record["finished_at"],
+        }
+        if self.finished:
+            data["result"] = record["result"]
+            if record["error"]:
+                data["error"] = record["error"]
+        return data
+
+
+class _JobQueue:
+    """Shared behaviour of the durable queues: submission limits and wait estimates."""
+
+    poll_interval = 0.5
+    worker_ttl = 60          # a worker that hasn't checked in for this long no longer counts
+
+    def __init__(self, max_pending=10, lease_seconds=600, max_attempts=2, ttl=3600):
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.ttl = ttl
+
+    def submit(self, kind, payload, meta=None):
+        """Enqueue a job for any worker to pick up and return its RemoteJob."""
+        now = time.time()
+        record = {
+            "id": uuid.uuid4().hex, "kind": kind, "payload": payload, "meta": meta or {},
+            "status": QUEUED, "result": None, "error": None, "worker": None, "attempts": 0,
+            "created_at": now, "started_at": None, "finished_at": None, "lease_until": None, "version": 0,
+        }
+        if not self._insert(record):
+            raise JobQueueFull(f"Job queue is full ({self.max_pending} pending)")
+        return RemoteJob(self, record)
+
+    def get(self, job_id):
+        record = self.record(job_id)
+        return None if record is None else RemoteJob(self, record)
+
+    def estimated_wait(self):
+        """Seconds a job submitted now would sit queued, from recent run times and live workers."""
+        stats = self.stats()
+        queued_ahead = stats[QUEUED] + stats[RUNNING] - stats["workers"] + 1
+        if queued_ahead <= 0:
+            return 0.0
+        return stats["avg_run_seconds"] * queued_ahead / max(1, stats["workers"])
+
+    def retry_after(self, default=30):
+        """Whole seconds a rejected client should wait before trying again."""
+        if not self.stats()["avg_run_seconds"]:
+            return default
+        return max(1, math.ceil(self.estimated_wait()))
+
+    def shutdown(self, wait=False):
+        pass
+
+
+class SQLiteJobQueue(_JobQueue):
+    """Durable job queue in a SQLite file shared by the API and any number of worker processes.
+
+    Workers claim jobs under a lease; a job whose worker dies is handed out
+    again once the lease runs out, up to `max_attempts` times.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+
+    def claim(self, worker_id):
+        """Take the oldest runnable job; returns its record or None if there is nothing to do."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR REPLACE INTO workers (id, seen_at) VALUES (?, ?)", (worker_id, now))
+                # Leases that ran out belong to dead workers: retry the job or give up on it
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = 'Worker lost', finished_at = ?, version = version + 1"
+                    " WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, now, RUNNING, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, lease_until = ?,"
+                    " attempts = attempts + 1, version = version + 1 WHERE id = ?",
+                    (RUNNING, worker_id, now, now + self.lease_seconds, row[0]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return self._fetch(conn, row[0])
+
+    def complete(self, job_id, worker_id, result):
+        self._finish(job_id, worker_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id, worker_id, error):
+        self._finish(job_id, worker_id, FAILED, error=error)
+
+    def record(self, job_id):
+        with self._lock:
+            return self._fetch(self._connect(), job_id)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            counts.update(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            workers = conn.execute(
+                "SELECT COUNT(*) FROM workers WHERE seen_at > ?", (now - self.worker_ttl,)
+            ).fetchone()[0]
+            avg = conn.execute(
+                "SELECT AVG(finished_at - started_at) FROM ("
+                " SELECT finished_at, started_at FROM jobs WHERE status = ?"
+                " ORDER BY finished_at DESC LIMIT 20)",
+                (DONE,),
+            ).fetchone()[0]
+        return {"capacity": self.max_pending, "pending": counts[QUEUED] + counts[RUNNING], **counts,
+                "workers": workers, "avg_run_seconds": round(avg or 0.0, 3)}
+
+    def heartbeat(self, worker_id):
+        """Mark `worker_id` alive; workers call this periodically, busy or not."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO workers (id, seen_at) VALUES (?, ?)", (worker_id, time.time()))
+
+    def _insert(self, record):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                             (DONE, FAILED, record["created_at"] - self.ttl))
+                # Queued and running both count, as in the in-process JobManager
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    conn.execute("COMMIT")
+                    return False
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, payload, meta, status, attempts, created_at, version)"
+                    " VALUES (?, ?, ?, ?, ?, 0, ?, 0)",
+                    (record["id"], record["kind"], json.dumps(record["payload"]), json.dumps(record["meta"]),
+                     QUEUED, record["created_at"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _finish(self, job_id, worker_id, status, result=None, error=None):
+        with self._lock:
+            # Only the current lease holder may finish a job that was handed out again
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL,"
+                " version = version + 1 WHERE id = ? AND worker = ? AND status = ?",
+                (status, result, error, time.time(), job_id, worker_id, RUNNING),
+            )
+
+    @staticmethod
+    def _fetch(conn, job_id):
+        row = conn.execute(
+            "SELECT id, kind, payload, meta, status, result, error, worker, attempts,"
+            " created_at, started_at, finished_at, lease_until, version FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "kind", "payload", "meta", "status", "result", "error", "worker", "attempts",
+                "created_at", "started_at", "finished_at", "lease_until", "version")
+        record = dict(zip(keys, row))
+        for key in ("payload", "meta", "result"):
+            if record[key] is not None:
+                record[key] = json.loads(record[key])
+        return record
+
+    def _connect(self):
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, meta TEXT NOT NULL,"
+                " status TEXT NOT NULL, result TEXT, error TEXT, worker TEXT, attempts INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL,"
+                " version INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+# Reaping expired leases and taking the next job happen in one script, so a worker
+# dying part-way can never drop a job between the queued list and the processing set.
+# KEYS: queued list, processing zset; ARGV: now, lease_until, max_attempts, job key
+# prefix, worker id, RUNNING, FAILED
+CLAIM_SCRIPT = """
+local now = ARGV[1]
+for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], 0, now)) do
+    redis.call('ZREM', KEYS[2], job_id)
+    local key = ARGV[4] .. job_id
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= tonumber(ARGV[3]) then
+        redis.call('HSET', key, 'status', ARGV[7], 'error', 'Worker lost', 'finished_at', now)
+        redis.call('HINCRBY', key, 'version', 1)
+    else
+        redis.call('RPUSH', KEYS[1], job_id)
+    end
+end
+local job_id = redis.call('LPOP', KEYS[1])
+if not job_id then
+    return false
+end
+redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+local key = ARGV[4] .. job_id
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', ARGV[6], 'worker', ARGV[5], 'started_at', now, 'lease_until', ARGV[2])
+redis.call('HINCRBY', key, 'version', 1)
+return job_id
+"""
+
+INSERT_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) + redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[3], 'kind', ARGV[4], 'payload', ARGV[5], 'meta', ARGV[6], 'status', ARGV[7],
+           'attempts', 0, 'created_at', ARGV[8], 'version', 0)
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+redis.call('RPUSH', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisJobQueue(_JobQueue):
+    """The same queue on a Redis-compatible server, for workers spread across machines.
+
+    Job records are hashes; ids wait on a list and move to a processing set
+    scored by lease expiry while a worker holds them. Admission and the move
+    are Lua scripts, so they are atomic.
+    """
+
+    def __init__(self, url, prefix="scrape", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for a redis:// job queue") from e
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+        self._claim = self._redis.register_script(CLAIM_SCRIPT)
+        self._enqueue = self._redis.register_script(INSERT_SCRIPT)
+
+    def claim(self, worker_id):
+        now = time.time()
+        self._redis.zadd(self._key("workers"), {worker_id: now})
+        # Leases that ran out belong to dead workers: the script retries the job or gives up on it
+        job_id = self._claim(
+            keys=[self._key("queued"), self._key("processing")],
+            args=[now, now + self.lease_seconds, self.max_attempts, self._key("job", ""), worker_id,
+                  RUNNING, FAILED],
+        )
+        if not job_id:
+            return None
+        return self.record(job_id)
+
+    def complete(self, job_id, worker_id, result):
+        self._finish(job_id, worker_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id, worker_id, error):
+        self._finish(job_id, worker_id, FAILED, error=error)
+
+    def record(self, job_id):
+        raw = self._redis.hgetall(self._key("job", job_id))
+        if not raw:
+            return None
+        record = {"id": job_id, "kind": raw["kind"], "worker": raw.get("worker") or None,
+                  "status": raw["status"], "error": raw.get("error") or None,
+                  "attempts": int(raw.get("attempts") or 0), "version": int(raw.get("version") or 0)}
+        for key in ("payload", "meta", "result"):
+            record[key] = json.loads(raw[key]) if raw.get(key) else None
+        for key in ("created_at", "started_at", "finished_at", "lease_until"):
+            record[key] = float(raw[key]) if raw.get(key) else None
+        return record
+
+    def stats(self):
+        now = time.time()
+        r = self._redis
+        durations = [float(value) for value in r.lrange(self._key("durations"), 0, -1)]
+        queued = r.llen(self._key("queued"))
+        running = r.zcard(self._key("processing"))
+        r.zremrangebyscore(self._key("workers"), 0, now - self.worker_ttl)
+        return {"capacity": self.max_pending, "pending": queued + running, QUEUED: queued, RUNNING: running,
+                "workers": r.zcard(self._key("workers")),
+                "avg_run_seconds": round(sum(durations) / len(durations), 3) if durations else 0.0}
+
+    def heartbeat(self, worker_id):
+        self._redis.zadd(self._key("workers"), {worker_id: time.time()})
+
+    def _insert(self, record):
+        # Checking capacity and enqueueing in one script keeps concurrent submits from overshooting max_pending
+        return bool(self._enqueue(
+            keys=[self._key("queued"), self._key("processing"), self._key("job", record["id"])],
+            args=[self.max_pending, self.ttl + self.lease_seconds * self.max_attempts, record["id"],
+                  record["kind"], json.dumps(record["payload"]), json.dumps(record["meta"]), QUEUED,
+                  record["created_at"]],
+        ))
+
+    def _finish(self, job_id, worker_id, status, result=None, error=None):
+        r = self._redis
+        key = self._key("job", job_id)
+        if r.hget(key, "worker") != worker_id or not r.zrem(self._key("processing"), job_id):
+            return
+        now = time.time()
+        fields = {"status": status, "finished_at": now, "result": result or "", "error": error or ""}
+        self._update(job_id, **fields)
+        started = r.hget(key, "started_at")
+        if status == DONE and started:
+            r.lpush(self._key("durations"), now - float(started))
+            r.ltrim(self._key("durations"), 0, 19)
+        r.expire(key, self.ttl)
+
+    def _update(self, job_id, **fields):
+        key = self._key("job", job_id)
+        self._redis.hset(key, mapping={name: "" if value is None else value for name, value in fields.items()})
+        self._redis.hincrby(key, "version", 1)
+
+    def _key(self, *parts):
+        return ":".join((self._prefix,) + parts)
+
+
+def open_job_queue(url, **kwargs):
+    """Build a queue from a URL: sqlite:////abs/jobs.sqlite3 (sqlite:///relative.sqlite3) or redis://host:port/db."""
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        return SQLiteJobQueue(url[len("sqlite:///"):], **kwargs)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisJobQueue(url, **kwargs)
+    raise ValueError(f"Unsupported job queue URL: {url}")
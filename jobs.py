@@ -0,0 +1,157 @@
+import math
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the executor already has as many jobs as it will accept."""
+
+
+class Job:
+    """A single background scrape and its observable state."""
+
+    def __init__(self, meta=None):
+        self.id = uuid.uuid4().hex
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def _update(self, **fields):
+        with self._cond:
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self.version += 1
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns True if it did within `timeout`."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.finished, timeout)
+
+    def wait_for_change(self, version, timeout=None):
+        """Block until the job's version moves past `version`; returns the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def to_dict(self):
+        with self._cond:
+            data = {
+                "job_id": self.id,
+                "status": self.status,
+                **self.meta,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if self.finished:
+                data["result"] = self.result
+                if self.error:
+                    data["error"] = self.error
+            return data
+
+
+class JobManager:
+    """Long-lived executor with a bounded backlog and an in-memory job table.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more may wait;
+    finished jobs are kept for `ttl` seconds so clients can poll for them.
+    """
+
+    def __init__(self, max_workers=1, max_queue=10, ttl=3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._max_workers = max_workers
+        self._avg_run_seconds = None
+        self._capacity = max_workers + max_queue
+        self._ttl = ttl
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, meta=None, **kwargs):
+        """Queue `fn(*args, **kwargs)` and return its Job without waiting for it."""
+        job = Job(meta)
+        with self._lock:
+            self._prune()
+            if self._pending >= self._capacity:
+                raise JobQueueFull(f"Job queue is full ({self._capacity} pending)")
+            self._pending += 1
+            self._jobs[job.id] = job
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+                self._jobs.pop(job.id, None)
+            raise
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"capacity": self._capacity, "pending": self._pending, **counts,
+                    "avg_run_seconds": round(self._avg_run_seconds or 0.0, 3)}
+
+    def estimated_wait(self):
+        """Seconds a job submitted now would sit queued, from the recent average run time."""
+        with self._lock:
+            avg = self._avg_run_seconds or 0.0
+            ahead = self._pending - self._max_workers + 1
+        return avg * ahead / self._max_workers if ahead > 0 else 0.0
+
+    def retry_after(self, default=30):
+        """Whole seconds a rejected client should wait before trying again."""
+        with self._lock:
+            if self._avg_run_seconds is None:
+                return default
+        return max(1, math.ceil(self.estimated_wait()))
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        job._update(status=RUNNING, started_at=time.time())
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+            job._update(status=DONE, result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"!!! Job {job.id} failed: {e} !!!")
+            job._update(status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._pending -= 1
+                # Exponentially weighted so Retry-After follows the current load
+                prev = self._avg_run_seconds
+                self._avg_run_seconds = elapsed if prev is None else 0.8 * prev + 0.2 * elapsed
+
+    def _prune(self):
+        cutoff = time.time() - self._ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,123 @@
+import os
+import json
+import uuid
+import shutil
+import socket
+import tempfile
+import threading
+
+PROFILE_PREFIX = "chrome_profile_"
+
+# Written into the profile template so every copy skips first-run work
+TEMPLATE_PREFERENCES = {
+    "browser": {"check_default_browser": False},
+    "credentials_enable_service": False,
+    "profile": {"password_manager_enabled": False, "exit_type": "Normal"},
+    "translate": {"enabled": False},
+}
+
+
+class LaunchManager:
+    """Hands out conflict-free debugging ports and disposable Chrome profile dirs.
+
+    Profiles are copied from a prepared template under `root` (put it on tmpfs
+    for speed) and removed again when the driver that used them is retired.
+    Directories left behind by dead processes are swept on startup.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(tempfile.gettempdir(), "chrome-profiles")
+        self.template_dir = os.path.join(self.root, "template")
+        self._ports = set()
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def acquire(self):
+        """Return (profile_dir, port) for a new browser."""
+        self._prepare()
+        profile_dir = os.path.join(self.root, f"{PROFILE_PREFIX}{os.getpid()}_{uuid.uuid4().hex[:8]}")
+        shutil.copytree(self.template_dir, profile_dir)
+        with self._lock:
+            self._profiles.add(profile_dir)
+            port = self._free_port()
+            self._ports.add(port)
+        return profile_dir, port
+
+    def release(self, profile_dir, port):
+        """Free the port and delete the profile dir of a retired browser."""
+        with self._lock:
+            self._ports.discard(port)
+            self._profiles.discard(profile_dir)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def stats(self):
+        """Live profiles and ports plus free disk space and inodes where profiles live."""
+        with self._lock:
+            stats = {"root": self.root, "profiles_active": len(self._profiles), "ports_in_use": sorted(self._ports)}
+        try:
+            fs = os.statvfs(self.root)
+            stats.update(
+                disk_free_bytes=fs.f_bavail * fs.f_frsize,
+                disk_total_bytes=fs.f_blocks * fs.f_frsize,
+                inodes_free=fs.f_favail,
+                inodes_total=fs.f_files,
+            )
+        except OSError:
+            pass
+        return stats
+
+    def _prepare(self):
+        with self._lock:
+            if self._ready:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            self._sweep_orphans()
+            if not os.path.isdir(self.template_dir):
+                staging = f"{self.template_dir}.{os.getpid()}"
+                os.makedirs(os.path.join(staging, "Default"), exist_ok=True)
+                open(os.path.join(staging, "First Run"), "w").close()
+                with open(os.path.join(staging, "Default", "Preferences"), "w") as f:
+                    json.dump(TEMPLATE_PREFERENCES, f)
+                try:
+                    os.rename(staging, self.template_dir)
+                except OSError:
+                    # Another worker won the race; its template is just as good
+                    shutil.rmtree(staging, ignore_errors=True)
+            self._ready = True
+
+    def _sweep_orphans(self):
+        removed = 0
+        for name in os.listdir(self.root):
+            if not name.startswith(PROFILE_PREFIX):
+                continue
+            try:
+                pid = int(name[len(PROFILE_PREFIX):].split("_", 1)[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"Removed {removed} orphaned Chrome profile dir(s) from {self.root}")
+
+    def _free_port(self):
+        # Let the OS pick, skipping anything we've handed out but Chrome hasn't bound yet
+        for _ in range(20):
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            if port not in self._ports:
+                return port
+        raise RuntimeError("Could not find a free remote debugging port")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
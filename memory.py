@@ -0,0 +1,202 @@
+import os
+import signal
+import threading
+import time
+
+
+def _children(pid):
+    children = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def _process_memory(pid):
+    """Proportional set size (shared pages split between Chrome's processes), falling back to RSS."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree(pid):
+    """`pid` followed by all its descendants (just `pid` where /proc isn't available)."""
+    tree = []
+    seen = set()
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        tree.append(current)
+        stack.extend(_children(current))
+    return tree
+
+
+def process_tree_memory(pid):
+    """Memory in bytes of `pid` and all its descendants, or None where /proc isn't available."""
+    if not os.path.isdir(f"/proc/{pid}"):
+        return None
+    return sum(_process_memory(current) for current in process_tree(pid))
+
+
+def _running(pid):
+    # Zombies have already released their memory and files; they only wait to be reaped
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rpartition(")")[2].split()[0] != "Z"
+    except (OSError, IndexError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def kill_process_tree(pid, timeout=5.0):
+    """SIGKILL `pid` and every descendant, then wait up to `timeout` for them to exit; True once all are gone.
+
+    The tree is collected before anything is killed: once chromedriver dies,
+    Chrome is re-parented and can no longer be found under it.
+    """
+    tree = process_tree(pid)
+    for current in tree:
+        try:
+            os.kill(current, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    end = time.monotonic() + timeout
+    while any(_running(current) for current in tree):
+        if time.monotonic() >= end:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def driver_memory(driver):
+    """Memory of a driver's chromedriver process and the browser tree under it."""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_memory(pid)
+
+
+def _memory_stat(path, key):
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(" ")
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def container_memory():
+    """(working_set_bytes, limit_bytes) for this container's cgroup, or None if it has no limit.
+
+    The working set is usage minus inactive page cache (what the kubelet and
+    `docker stats` report): raw usage includes cache the kernel reclaims
+    freely, and creeps up to the limit on any long-running, disk-busy box.
+    """
+    candidates = [
+        ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.max",
+         "/sys/fs/cgroup/memory.stat", "inactive_file"),
+        ("/sys/fs/cgroup/memory/memory.usage_in_bytes", "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+         "/sys/fs/cgroup/memory/memory.stat", "total_inactive_file"),
+    ]
+    for used_path, limit_path, stat_path, inactive_key in candidates:
+        try:
+            with open(used_path) as f:
+                used = int(f.read().strip())
+            with open(limit_path) as f:
+                raw = f.read().strip()
+        except (OSError, ValueError):
+            continue
+        if raw == "max" or int(raw) >= 1 << 60:
+            return None
+        return max(0, used - _memory_stat(stat_path, inactive_key)), int(raw)
+    return None
+
+
+class MemoryWatchdog:
+    """Periodically retires idle drivers whose browser tree has grown past `limit_bytes`.
+
+    Only idle drivers are touched, so a browser is never pulled out from under
+    a running scrape; busy ones are checked again when they are checked in.
+    """
+
+    def __init__(self, limit_bytes, interval=30):
+        self.pool = None
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.last_samples = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def over_limit(self, driver):
+        used = driver_memory(driver)
+        if used is None:
+            return False
+        self.last_samples[id(driver)] = used
+        if used > self.limit_bytes:
+            print(f"!!! Chrome driver using {used / 2**20:.0f}MB (limit {self.limit_bytes / 2**20:.0f}MB), recycling !!!")
+            return True
+        return False
+
+    def start(self, pool):
+        """Begin sweeping `pool`'s idle drivers in a daemon thread."""
+        self.pool = pool
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        samples = list(self.last_samples.values())
+        return {
+            "limit_bytes": self.limit_bytes,
+            "drivers_sampled": len(samples),
+            "max_driver_bytes": max(samples) if samples else 0,
+            "sampled_at": time.time(),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                retired = self.pool.sweep_idle(self.over_limit)
+                live = set(self.pool.driver_ids())
+                for key in list(self.last_samples):
+                    if key not in live:
+                        self.last_samples.pop(key, None)
+                if retired:
+                    print(f"Memory watchdog recycled {retired} idle driver(s)")
+            except Exception as e:
+                print(f"Memory watchdog sweep failed: {e}")
@@ -0,0 +1,184 @@
+import time
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the `with` block."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = {key: list(entry) for key, entry in self._values.items()}
+        lines = []
+        for key, entry in sorted(values.items()):
+            for bound, count in zip(self.buckets, entry):
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', _number(bound))])} {count}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', '+Inf')])} {entry[-1]}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(entry[-2])}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {entry[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds this process's metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def add_gauge_collector(self, name, help_text, collect):
+        """Register a gauge whose samples come from `collect()` as [(labels_dict, value)] at scrape time."""
+        with self._lock:
+            self._collectors.append((name, help_text, collect))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, help_text, collect in collectors:
+            try:
+                samples = collect()
+            except Exception as e:
+                print(f"Metrics collector {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{body}}} {_number(value)}" if body else f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+
+# Stage latencies
+DRIVER_STARTUP_SECONDS = REGISTRY.histogram(
+    "scrape_driver_startup_seconds", "Chrome driver launch time by the strategy that succeeded", ["strategy"])
+PAGE_LOAD_SECONDS = REGISTRY.histogram(
+    "scrape_page_load_seconds", "Time from driver.get to results or block page being ready", ["engine", "blocking"])
+PAGE_TRANSFER_BYTES = REGISTRY.histogram(
+    "scrape_page_transfer_bytes", "Bytes transferred per results page navigation by blocking profile", ["blocking"],
+    buckets=(50e3, 100e3, 250e3, 500e3, 1e6, 2e6, 5e6))
+WAIT_SECONDS = REGISTRY.histogram(
+    "scrape_wait_seconds", "Duration of explicit readiness waits", ["wait", "outcome"])
+EXTRACTION_SECONDS = REGISTRY.histogram(
+    "scrape_extraction_seconds", "Time spent extracting profiles from a results page", ["mode"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+ENGINE_SECONDS = REGISTRY.histogram(
+    "scrape_engine_seconds", "Search engine latency per query", ["engine", "outcome"])
+RESULTS_PER_QUERY = REGISTRY.histogram(
+    "scrape_results_per_query", "Profiles found per role query", ["role"], buckets=(0, 1, 2, 3, 4, 5, 10))
+
+# Events
+DRIVER_LAUNCHES = REGISTRY.counter(
+    "scrape_driver_launches_total", "Chrome driver launches by the strategy that succeeded (1/2/3)", ["strategy"])
+BLOCK_PAGES = REGISTRY.counter(
+    "scrape_block_pages_total", "CAPTCHA / block pages detected", ["engine"])
+TIMEOUTS = REGISTRY.counter(
+    "scrape_timeouts_total", "Timeouts by stage", ["stage"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "scrape_cache_requests_total", "Result cache lookups", ["result"])
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "scrape_admission_rejections_total", "Requests turned away with 503 before any work started", ["endpoint", "reason"])
+ENGINE_WINS = REGISTRY.counter(
+    "scrape_engine_wins_total", "Queries where this engine's profiles came back first", ["engine"])
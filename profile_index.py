@@ -0,0 +1,85 @@
+import os
+import time
+import sqlite3
+import threading
+
+
+class ProfileIndex:
+    """Every profile ever found per company and role, keyed by canonical URL.
+
+    Kept in SQLite across restarts so a re-scrape knows which profiles it has
+    already confirmed: it can stop once fresh plus known-good profiles fill
+    the slots, and fall back on them when a search comes up short.
+    """
+
+    def __init__(self, path, max_age=30 * 86400):
+        self.path = path
+        self.max_age = max_age
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+
+    def known(self, company, role, limit=None):
+        """Profiles seen for (company, role) within `max_age`, most often and most recently seen first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT name, url FROM profiles WHERE company = ? AND role = ? AND last_seen > ?"
+                " ORDER BY seen_count DESC, last_seen DESC LIMIT ?",
+                (_company_key(company), role, time.time() - self.max_age, -1 if limit is None else limit),
+            ).fetchall()
+        return [{"name": name, "url": url} for name, url in rows]
+
+    def record(self, company, role, profiles):
+        """Remember freshly found profiles; returns how many were new."""
+        if not profiles:
+            return 0
+        now = time.time()
+        company = _company_key(company)
+        new = 0
+        with self._lock:
+            conn = self._connect()
+            for profile in profiles:
+                cursor = conn.execute(
+                    "UPDATE profiles SET name = ?, last_seen = ?, seen_count = seen_count + 1"
+                    " WHERE company = ? AND role = ? AND url = ?",
+                    (profile["name"], now, company, role, profile["url"]),
+                )
+                if cursor.rowcount == 0:
+                    conn.execute(
+                        "INSERT INTO profiles (company, role, url, name, first_seen, last_seen, seen_count)"
+                        " VALUES (?, ?, ?, ?, ?, ?, 1)",
+                        (company, role, profile["url"], profile["name"], now, now),
+                    )
+                    new += 1
+            conn.execute("DELETE FROM profiles WHERE last_seen < ?", (now - self.max_age,))
+            conn.commit()
+        return new
+
+    def stats(self):
+        with self._lock:
+            profiles, companies = self._connect().execute(
+                "SELECT COUNT(*), COUNT(DISTINCT company) FROM profiles"
+            ).fetchone()
+        return {"profiles": profiles, "companies": companies, "max_age": self.max_age}
+
+    def _connect(self):
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " company TEXT NOT NULL, role TEXT NOT NULL, url TEXT NOT NULL, name TEXT NOT NULL,"
+                " first_seen REAL NOT NULL, last_seen REAL NOT NULL, seen_count INTEGER NOT NULL,"
+                " PRIMARY KEY (company, role, url))"
+            )
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+def _company_key(company):
+    return company.strip().lower()
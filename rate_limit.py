@@ -0,0 +1,95 @@
+import time
+import random
+import threading
+import urllib.parse
+from collections import deque
+from deadline import DeadlineExceeded
+
+
+def parse_host_delays(spec):
+    """Parse "host=seconds,host=seconds" into a dict, ignoring malformed entries."""
+    delays = {}
+    for item in (spec or "").split(","):
+        host, _, value = item.partition("=")
+        try:
+            delays[host.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return delays
+
+
+class HostThrottle:
+    """Spaces out requests to the same host across every thread in the process.
+
+    Each call to `wait` reserves the next free slot for that host and sleeps
+    until it arrives, so concurrent scrapes queue up instead of bursting. When
+    `budget` is set, no host gets more than `budget` requests per `window` seconds.
+    A slot that would arrive after the caller's deadline is refused rather than
+    reserved.
+    """
+
+    def __init__(self, default_delay=0.0, host_delays=None, jitter=0.0, budget=0, window=60.0):
+        self._default_delay = default_delay
+        self._host_delays = dict(host_delays or {})
+        self._jitter = jitter
+        self._budget = budget
+        self._window = window
+        self._next_slot = {}
+        self._history = {}
+        self._lock = threading.Lock()
+
+    def delay_for(self, host):
+        return self._host_delays.get(host, self._default_delay)
+
+    def wait(self, url_or_host, deadline=None):
+        """Sleep until a request to this host is allowed; returns seconds slept.
+
+        Raises DeadlineExceeded, without taking a slot, if `deadline` has passed
+        or the next slot comes after it; also stops sleeping if it is cancelled.
+        """
+        host = _host_of(url_or_host)
+        with self._lock:
+            now = time.monotonic()
+            if deadline is not None:
+                deadline.check("throttle")
+            slot = max(now, self._next_slot.get(host, now))
+            if self._budget > 0:
+                history = self._history.setdefault(host, deque())
+                if len(history) >= self._budget:
+                    slot = max(slot, history[-self._budget] + self._window)
+            if deadline is not None and slot - now > deadline.remaining():
+                raise DeadlineExceeded("throttle")
+            if self._budget > 0:
+                while history and history[0] <= slot - self._window:
+                    history.popleft()
+                history.append(slot)
+            gap = self.delay_for(host)
+            if gap > 0 and self._jitter > 0:
+                gap += random.uniform(0, self._jitter)
+            self._next_slot[host] = slot + gap
+        pause = slot - now
+        if deadline is None:
+            if pause > 0:
+                time.sleep(pause)
+            return pause
+        # The slot stays taken if we give up (later reservations are already spaced after it),
+        # but a cancelled caller stops sleeping instead of holding a thread until then
+        while True:
+            left = slot - time.monotonic()
+            if left <= 0:
+                return pause
+            time.sleep(min(left, 0.25))
+            deadline.check("throttle")
+
+    def stats(self):
+        """Requests reserved per host within the current budget window."""
+        with self._lock:
+            now = time.monotonic()
+            return {host: sum(1 for t in history if t > now - self._window)
+                    for host, history in self._history.items()}
+
+
+def _host_of(url_or_host):
+    if "://" in url_or_host:
+        return (urllib.parse.urlsplit(url_or_host).hostname or "").lower()
+    return url_or_host.lower()
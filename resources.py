@@ -0,0 +1,129 @@
+import random
+import threading
+import metrics
+
+# URL patterns handed to CDP Network.setBlockedURLs for each profile. We only
+# read anchors and h3 titles, so nothing here is needed to extract results.
+IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+          "*encrypted-tbn*.gstatic.com*"]
+FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.gstatic.com*", "*fonts.googleapis.com*"]
+MEDIA = ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg"]
+TRACKERS = ["*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+            "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.*",
+            "*bat.bing.com*", "*clarity.ms*", "*/gen_204*", "*/client_204*"]
+
+BLOCK_PROFILES = {
+    "off": [],
+    "standard": IMAGES + FONTS + MEDIA + TRACKERS,
+    "strict": IMAGES + FONTS + MEDIA + TRACKERS + ["*.css", "*/xjs/*"],
+}
+
+# Content settings that don't depend on the URL; applied at launch for any profile but "off"
+CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.popups": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+}
+
+TRANSFER_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+let bytes = nav ? (nav.transferSize || 0) : 0;
+let count = 0;
+for (const entry of performance.getEntriesByType('resource')) {
+    bytes += entry.transferSize || 0;
+    count += 1;
+}
+return {bytes: bytes, resources: count};
+"""
+
+
+class ResourceBlocker:
+    """Blocks page resources the scraper never looks at and measures what that saves.
+
+    A `control_rate` share of navigations runs with blocking switched off, so
+    the savings are measured against a live baseline rather than guessed.
+    """
+
+    def __init__(self, profile="standard", control_rate=0.0):
+        if profile not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown resource blocking profile: {profile}")
+        self.profile = profile
+        self.control_rate = control_rate
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def apply_prefs(self, options):
+        if self.profile == "off":
+            return
+        prefs = dict(CHROME_PREFS)
+        if self.control_rate:
+            # Launch-wide, so it would strip images from the control navigations too
+            prefs.pop("profile.managed_default_content_settings.images")
+        options.add_experimental_option("prefs", prefs)
+
+    def install(self, driver):
+        """Enable the network domain on a freshly launched driver and apply the profile."""
+        driver.blocking_profile = None
+        if self.profile == "off":
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            self._set_profile(driver, self.profile)
+        except Exception as e:
+            print(f"!!! Could not install resource blocking: {e} !!!")
+
+    def before_navigation(self, driver):
+        """Pick the profile for the next navigation; returns its name."""
+        if self.profile == "off" or getattr(driver, "blocking_profile", None) is None:
+            return "off"
+        profile = "off" if self.control_rate and random.random() < self.control_rate else self.profile
+        if driver.blocking_profile != profile:
+            try:
+                self._set_profile(driver, profile)
+            except Exception as e:
+                print(f"Could not switch resource blocking to {profile}: {e}")
+                return driver.blocking_profile
+        return profile
+
+    def record(self, driver, profile, load_seconds):
+        """Record page weight and load time for one navigation under `profile`."""
+        try:
+            transfer = driver.execute_script(TRANSFER_SCRIPT) or {}
+        except Exception:
+            transfer = {}
+        transfer_bytes = int(transfer.get("bytes") or 0)
+        metrics.PAGE_TRANSFER_BYTES.observe(transfer_bytes, blocking=profile)
+        with self._lock:
+            entry = self._stats.setdefault(profile, {"navigations": 0, "bytes": 0, "seconds": 0.0, "resources": 0})
+            entry["navigations"] += 1
+            entry["bytes"] += transfer_bytes
+            entry["resources"] += int(transfer.get("resources") or 0)
+            entry["seconds"] += load_seconds
+
+    def stats(self):
+        """Average page weight / load time per profile, and savings against the 'off' baseline."""
+        with self._lock:
+            stats = {
+                profile: {
+                    "navigations": entry["navigations"],
+                    "avg_bytes": round(entry["bytes"] / entry["navigations"]),
+                    "avg_resources": round(entry["resources"] / entry["navigations"], 1),
+                    "avg_load_seconds": round(entry["seconds"] / entry["navigations"], 3),
+                }
+                for profile, entry in self._stats.items()
+            }
+        baseline = stats.get("off")
+        active = stats.get(self.profile)
+        if baseline and active and self.profile != "off":
+            active["bytes_saved_per_navigation"] = baseline["avg_bytes"] - active["avg_bytes"]
+            active["seconds_saved_per_navigation"] = round(
+                baseline["avg_load_seconds"] - active["avg_load_seconds"], 3)
+        return {"profile": self.profile, "control_rate": self.control_rate, "profiles": stats}
+
+    @staticmethod
+    def _set_profile(driver, profile):
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCK_PROFILES[profile]})
+        driver.blocking_profile = profile
@@ -0,0 +1,69 @@
+import json
+
+FIXED_COLUMNS = ["Company Name", "Status"]
+
+
+class Role:
+    """One profile search per company: a query template and how many result slots it fills."""
+
+    def __init__(self, name, label, query, slots):
+        if not isinstance(query, str) or "{company}" not in query:
+            raise ValueError(f"Query template for role '{name}' must contain {{company}}")
+        if slots < 1:
+            raise ValueError(f"Role '{name}' needs at least one slot")
+        self.name = name
+        self.label = label
+        self.query = query
+        self.slots = slots
+
+    def query_for(self, company_name):
+        # Plain substitution: any other braces in the template are literal text
+        return self.query.replace("{company}", company_name)
+
+    def columns(self):
+        """This role's block of the wide table: every slot's name, then every slot's URL."""
+        return ([f"{self.label} {i} Name" for i in range(1, self.slots + 1)]
+                + [f"{self.label} {i} URL" for i in range(1, self.slots + 1)])
+
+    def __repr__(self):
+        return f"Role({self.name!r}, slots={self.slots})"
+
+
+# The original layout n8n was built against: 5 engineers, 2 recruiters
+DEFAULT_ROLES = [
+    Role("sde", "SDE", 'site:linkedin.com/in/ "Software Engineer" "{company}" "India"', 5),
+    Role("hr", "HR", 'site:linkedin.com/in/ "Talent Acquisition" OR "Recruiter" "{company}" "India"', 2),
+]
+
+
+def load_roles(spec):
+    """Roles from ROLE_TEMPLATES: inline JSON or the path of a JSON file; the defaults when empty.
+
+    Each entry is {"name": "sde", "label": "SDE", "query": "... {company} ...", "slots": 5};
+    `label` defaults to the upper-cased name and `slots` to 1.
+    """
+    if not spec or not spec.strip():
+        return list(DEFAULT_ROLES)
+    if spec.lstrip().startswith("["):
+        entries = json.loads(spec)
+    else:
+        with open(spec) as f:
+            entries = json.load(f)
+    roles = [Role(entry["name"], entry.get("label") or entry["name"].upper(), entry["query"],
+                  int(entry.get("slots", 1)))
+             for entry in entries]
+    if not roles:
+        raise ValueError("ROLE_TEMPLATES must declare at least one role")
+    for attr in ("name", "label"):
+        values = [getattr(role, attr) for role in roles]
+        if len(set(values)) != len(values):
+            raise ValueError(f"Role {attr}s must be unique: {values}")
+    return roles
+
+
+def table_columns(roles):
+    """Header of the wide table, in the order rows are built."""
+    columns = list(FIXED_COLUMNS)
+    for role in roles:
+        columns.extend(role.columns())
+    return columns
@@ -0,0 +1,160 @@
+import os
+import json
+import math
+import time
+import threading
+
+PRIOR_SUCCESS = 0.5      # assumed hit rate before an engine has any history
+PRIOR_WEIGHT = 1.0       # how many observations that assumption is worth
+PRIOR_LATENCY = 2.0      # seconds per configured rank for engines never timed
+MIN_LATENCY = 0.1        # floor, so an engine that fails fast doesn't look free
+
+
+class EngineScheduler:
+    """Orders search engines by expected time to a result, from rolling per-engine stats.
+
+    Hit rate and latency decay by `decay` per observation so recent behaviour
+    dominates. Engines are sorted by latency / hit rate (the expected cost of
+    trying them first); ones that keep coming back empty are skipped except
+    for an occasional probe, and ones that signal overload (HTTP 429/503,
+    block pages) sit out an exponentially growing backoff. State is saved to
+    `path` so a restart keeps what was learned.
+    """
+
+    def __init__(self, names, path=None, decay=0.9, base_backoff=30, max_backoff=900,
+                 min_success=0.05, probe_interval=300, save_interval=30):
+        self.path = path
+        self.decay = decay
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_success = min_success
+        self.probe_interval = probe_interval
+        self.save_interval = save_interval
+        self._state = {name: _empty_state() for name in names}
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._load()
+
+    def order(self, preferred):
+        """`preferred` re-sorted by expected cost, minus engines that are backing off or not worth trying."""
+        now = time.time()
+        with self._lock:
+            available = [name for name in preferred if self._entry(name)["backoff_until"] <= now]
+            worth_trying = [name for name in available if not self._written_off(name, now)]
+            candidates = worth_trying or available
+            return sorted(candidates, key=lambda name: (self._cost(name, preferred.index(name)),
+                                                        preferred.index(name)))
+
+    def record(self, name, outcome, seconds):
+        """Fold one engine call into the rolling stats.
+
+        Timeouts count as misses and their elapsed time goes into the latency;
+        calls cancelled because another engine already had enough carry no
+        signal and are ignored.
+        """
+        if outcome not in ("hits", "empty", "errors", "timeouts"):
+            return
+        with self._lock:
+            state = self._entry(name)
+            state["weight"] = state["weight"] * self.decay + 1
+            state["hits"] = state["hits"] * self.decay + (1 if outcome == "hits" else 0)
+            state["last_tried"] = time.time()
+            if state["latency"] is None:
+                state["latency"] = seconds
+            else:
+                state["latency"] = state["latency"] * self.decay + seconds * (1 - self.decay)
+            if outcome == "hits":
+                state["backoff_seconds"] = 0
+        self._maybe_save()
+
+    def overloaded(self, name, retry_after=None):
+        """Bench `name` for its next backoff step (or `retry_after`, if the engine asked for longer)."""
+        now = time.time()
+        with self._lock:
+            state = self._entry(name)
+            step = min(self.max_backoff, max(self.base_backoff, state["backoff_seconds"] * 2))
+            state["backoff_seconds"] = step
+            state["backoff_until"] = now + max(step, retry_after or 0)
+            state["overloads"] += 1
+            until = state["backoff_until"] - now
+        print(f"!!! {name} signalled overload, backing off for {until:.0f}s !!!")
+        self._maybe_save(force=True)
+
+    def retry_after(self, names):
+        """Whole seconds until the first of `names` comes out of backoff (at least 1)."""
+        now = time.time()
+        with self._lock:
+            waits = [self._entry(name)["backoff_until"] - now for name in names]
+        return max(1, math.ceil(min(waits, default=0)))
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    "success_rate": round(self._success(name), 3),
+                    "latency_seconds": round(state["latency"], 3) if state["latency"] is not None else None,
+                    "backoff_remaining": round(max(0.0, state["backoff_until"] - now), 1),
+                    "overloads": state["overloads"],
+                    "skipped": self._written_off(name, now),
+                }
+                for name, state in self._state.items()
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._state)
+            self._saved_at = time.monotonic()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save engine stats: {e}")
+
+    def _entry(self, name):
+        return self._state.setdefault(name, _empty_state())
+
+    def _success(self, name):
+        state = self._state[name]
+        return (state["hits"] + PRIOR_SUCCESS * PRIOR_WEIGHT) / (state["weight"] + PRIOR_WEIGHT)
+
+    def _cost(self, name, rank):
+        latency = self._state[name]["latency"]
+        if latency is None:
+            latency = PRIOR_LATENCY * (rank + 1)
+        return max(latency, MIN_LATENCY) / max(self._success(name), 0.01)
+
+    def _written_off(self, name, now):
+        # Keep probing now and then so an engine that recovers gets back in the rotation
+        state = self._state[name]
+        return (state["weight"] >= 5 and self._success(name) < self.min_success
+                and now - state["last_tried"] < self.probe_interval)
+
+    def _maybe_save(self, force=False):
+        if force or time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, state in saved.items():
+            if name in self._state and isinstance(state, dict):
+                self._state[name].update({key: state[key] for key in self._state[name] if key in state})
+        print(f"Loaded engine stats for {', '.join(name for name in saved if name in self._state)}")
+
+
+def _empty_state():
+    return {"weight": 0.0, "hits": 0.0, "latency": None, "backoff_until": 0.0, "backoff_seconds": 0,
+            "overloads": 0, "last_tried": 0.0}
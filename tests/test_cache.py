@@ -0,0 +1,96 @@
+import time
+import threading
+
+import pytest
+
+from cache import ResultCache, SingleFlight
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "results.sqlite3"), ttl=60, max_entries=3)
+
+
+def test_get_returns_value_and_age(cache):
+    assert cache.get("k") is None
+    cache.set("k", [{"name": "A", "url": "u"}])
+    value, age = cache.get("k")
+    assert value == [{"name": "A", "url": "u"}]
+    assert 0 <= age < 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_misses_and_removed(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), ttl=0.05)
+    cache.set("k", [1])
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key)[0] for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats()["entries"] == 3
+
+
+def test_cache_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path).set("k", {"x": 1})
+    assert ResultCache(path).get("k")[0] == {"x": 1}
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return {"n": len(calls)}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("acme", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == {"n": 1} for result, _ in results)
+
+
+def test_single_flight_shares_errors_and_forgets_finished_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def follower():
+        started.wait(1)
+        try:
+            flight.do("acme", lambda: "unused")
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        flight.do("acme", failing)
+    thread.join()
+    assert len(errors) == 1
+    assert flight.do("acme", lambda: "fresh") == ("fresh", False)
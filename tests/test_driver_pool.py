@@ -0,0 +1,152 @@
+import time
+import threading
+
+import pytest
+
+from driver_pool import DriverPool, DriverPoolExhausted
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class Factory:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self.lock:
+            driver = FakeDriver(len(self.drivers))
+            self.drivers.append(driver)
+        return driver
+
+
+def test_checkin_reuses_the_warmest_driver():
+    factory = Factory()
+    pool = DriverPool(factory, size=2)
+    first = pool.checkout()
+    second = pool.checkout()
+    pool.checkin(first)
+    pool.checkin(second)
+    assert pool.checkout() is second
+    stats = pool.stats()
+    assert (stats["created"], stats["reused"], stats["in_use"], stats["idle"]) == (2, 1, 1, 1)
+
+
+def test_checkout_waits_for_a_free_driver_then_times_out():
+    pool = DriverPool(Factory(), size=1)
+    driver = pool.checkout()
+    threading.Timer(0.05, pool.checkin, args=(driver,)).start()
+    assert pool.checkout(timeout=2) is driver
+    with pytest.raises(DriverPoolExhausted):
+        pool.checkout(timeout=0.05)
+
+
+def test_size_is_never_exceeded_under_contention():
+    factory = Factory(delay=0.01)
+    pool = DriverPool(factory, size=3)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with pool.driver(timeout=5) as driver:
+            with lock:
+                active.append(driver)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(driver)
+
+    threads = [threading.Thread(target=work) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert len(factory.drivers) <= 3
+    assert pool.stats()["checkouts"] == 20
+
+
+def test_worn_out_broken_and_unhealthy_drivers_are_retired():
+    retired = []
+    pool = DriverPool(Factory(), size=1, max_uses=2, on_retire=retired.append)
+
+    driver = pool.checkout()
+    pool.checkin(driver)
+    assert pool.checkout() is driver
+    pool.checkin(driver)
+    assert retired == [driver] and driver.quit_calls == 1
+
+    broken = pool.checkout()
+    pool.checkin(broken, broken=True)
+    assert retired[-1] is broken
+
+    sick = pool.checkout()
+    pool.checkin(sick)
+    sick.healthy = False
+    replacement = pool.checkout()
+    assert replacement is not sick
+    assert retired[-1] is sick
+    stats = pool.stats()
+    assert stats["retired_max_uses"] == 1
+    assert stats["retired_unhealthy"] == 2
+
+
+def test_should_retire_and_sweep_idle():
+    over = set()
+    pool = DriverPool(Factory(), size=2, should_retire=lambda driver: driver.number in over)
+    first = pool.checkout()
+    second = pool.checkout()
+    over.add(first.number)
+    pool.checkin(first)
+    pool.checkin(second)
+    assert pool.stats()["retired_over_limit"] == 1
+    assert pool.stats()["idle"] == 1
+
+    assert pool.sweep_idle(lambda driver: driver is second) == 1
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["retired_over_limit"] == 2
+    assert pool.checkout() not in (first, second)
+
+
+def test_failed_launch_frees_its_slot():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("chrome failed to start")
+        return FakeDriver(len(calls))
+
+    pool = DriverPool(flaky, size=1)
+    with pytest.raises(RuntimeError):
+        pool.checkout(timeout=0.1)
+    assert pool.checkout(timeout=0.1).number == 2
+
+
+def test_prewarm_and_close():
+    factory = Factory()
+    pool = DriverPool(factory, size=2)
+    assert pool.prewarm(5) == 2
+    busy = pool.checkout()
+    pool.close()
+    assert [driver.quit_calls for driver in factory.drivers if driver is not busy] == [1]
+    pool.checkin(busy)
+    assert busy.quit_calls == 1
+    with pytest.raises(DriverPoolExhausted):
+        pool.checkout(timeout=0.1)
@@ -0,0 +1,152 @@
+import time
+import threading
+
+import pytest
+
+from deadline import Deadline, DeadlineExceeded
+from engines import EngineOverloaded, EngineRunner
+
+
+def profile(slug):
+    return {"name": slug.title(), "url": f"https://www.linkedin.com/in/{slug}"}
+
+
+class FakeEngine:
+    """Returns `result` (or raises it) after `delay`, honouring the deadline like a real engine."""
+
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, query, max_results, deadline=None):
+        self.calls += 1
+        end = time.monotonic() + self.delay
+        while time.monotonic() < end:
+            time.sleep(0.005)
+            if deadline is not None:
+                deadline.check("fake")
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
+
+def runner(engines, hedge_delay=0.0, **kwargs):
+    return EngineRunner(engines, list(engines), hedge_delay=hedge_delay, max_workers=4, **kwargs)
+
+
+@pytest.mark.parametrize("hedge_delay", [-1, 0.0, 0.05])
+def test_first_engine_with_profiles_wins(hedge_delay):
+    engines = {"a": FakeEngine([]), "b": FakeEngine([profile("x")], delay=0.01)}
+    r = runner(engines, hedge_delay)
+    assert r.search("q", 5) == [profile("x")]
+    stats = r.stats()
+    assert stats["b"]["wins"] == 1
+    assert stats["a"]["empty"] == 1
+
+
+def test_hedged_results_are_merged_and_deduped():
+    engines = {
+        "a": FakeEngine([profile("x"), profile("y")]),
+        "b": FakeEngine([profile("y"), profile("z")], delay=0.02),
+    }
+    assert runner(engines).search("q", 5) == [profile("x"), profile("y"), profile("z")]
+
+
+def test_enough_profiles_cancel_the_slow_engine():
+    slow = FakeEngine([profile("late")], delay=5)
+    r = runner({"fast": FakeEngine([profile("x"), profile("y")]), "slow": slow})
+    started = time.monotonic()
+    assert r.search("q", 2) == [profile("x"), profile("y")]
+    assert time.monotonic() - started < 1
+    time.sleep(0.1)
+    assert r.stats()["slow"]["cancelled"] == 1
+    assert r.stats()["slow"]["timeouts"] == 0
+
+
+def test_known_profiles_count_towards_max_results():
+    slow = FakeEngine([profile("late")], delay=5)
+    r = runner({"fast": FakeEngine([profile("x")]), "slow": slow})
+    known = [profile("k1")["url"], profile("k2")["url"]]
+    started = time.monotonic()
+    assert r.search("q", 3, known=known) == [profile("x")]
+    assert time.monotonic() - started < 1
+
+
+def test_browser_engine_waits_for_every_http_engine():
+    browser = FakeEngine([profile("g")])
+    engines = {"google": browser, "ddg": FakeEngine([profile("x")], delay=0.05), "bing": FakeEngine([profile("y")])}
+    r = runner(engines, hedge_delay=0.0, browser_engines=["google"])
+    assert r.search("q", 5) == [profile("y"), profile("x")]
+    assert browser.calls == 0
+
+
+@pytest.mark.parametrize("hedge_delay", [-1, 0.0])
+def test_browser_engine_runs_when_http_engines_come_back_empty(hedge_delay):
+    engines = {"google": FakeEngine([profile("g")]), "ddg": FakeEngine([]), "bing": FakeEngine(None)}
+    r = runner(engines, hedge_delay, browser_engines=["google"])
+    assert r.search("q", 5) == [profile("g")]
+
+
+@pytest.mark.parametrize("hedge_delay", [-1, 0.0])
+def test_engine_error_is_skipped_when_another_engine_answered(hedge_delay):
+    engines = {"a": FakeEngine(ConnectionError("reset")), "b": FakeEngine([])}
+    assert runner(engines, hedge_delay).search("q", 5) == []
+
+
+@pytest.mark.parametrize("hedge_delay", [-1, 0.0])
+def test_first_error_is_raised_when_every_engine_failed(hedge_delay):
+    engines = {"a": FakeEngine(ConnectionError("reset")), "b": FakeEngine(ValueError("bad page"), delay=0.02)}
+    with pytest.raises(ConnectionError):
+        runner(engines, hedge_delay).search("q", 5)
+
+
+def test_overload_mid_search_does_not_fail_the_search():
+    engines = {"a": FakeEngine(EngineOverloaded("a", 60)), "b": FakeEngine([profile("x")], delay=0.01)}
+    r = runner(engines)
+    assert r.search("q", 5) == [profile("x")]
+    assert r.stats()["a"]["overloaded"] == 1
+
+
+def test_deadline_expiry_is_a_timeout():
+    r = runner({"slow": FakeEngine([profile("x")], delay=5)})
+    with pytest.raises(DeadlineExceeded):
+        r.search("q", 5, deadline=Deadline(0.1))
+    time.sleep(0.1)
+    assert r.stats()["slow"]["timeouts"] == 1
+    assert r.stats()["slow"]["cancelled"] == 0
+
+
+class BenchedScheduler:
+    def __init__(self):
+        self.recorded = []
+
+    def order(self, preferred):
+        return []
+
+    def retry_after(self, names):
+        return 42
+
+    def record(self, name, outcome, seconds):
+        self.recorded.append((name, outcome))
+
+
+def test_every_engine_benched_raises_overloaded():
+    engine = FakeEngine([profile("x")])
+    r = runner({"a": engine}, scheduler=BenchedScheduler())
+    with pytest.raises(EngineOverloaded) as excinfo:
+        r.search("q", 5)
+    assert excinfo.value.retry_after == 42
+    assert engine.calls == 0
+
+
+def test_concurrent_searches_share_the_executor():
+    r = runner({"a": FakeEngine([profile("x")], delay=0.02), "b": FakeEngine([profile("y")], delay=0.02)})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(r.search("q", 2))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6
+    assert all(sorted(p["url"] for p in result) == [profile("x")["url"], profile("y")["url"]] for result in results)
@@ -0,0 +1,26 @@
+from export import stream_csv, table_row
+
+
+def _result(name, status="Completed"):
+    return {"excel_data": [{"Company Name": name, "Status": status}]}
+
+
+def test_table_row_fills_missing_columns():
+    header = ["Company Name", "Status", "SDE 1 Name"]
+    assert table_row(header, 3, _result("Acme")) == (3, "Acme", "Completed", "")
+
+
+def test_csv_flushes_a_row_per_finished_company():
+    header = ["Company Name", "Status"]
+    pulled = []
+
+    def results():
+        for index, name in [(1, "Beta"), (0, "Acme, Inc")]:
+            pulled.append(index)
+            yield index, _result(name)
+
+    stream = stream_csv(header, results())
+    assert next(stream) == "Index,Company Name,Status\r\n"
+    assert next(stream) == "1,Beta,Completed\r\n"
+    assert pulled == [1]
+    assert list(stream) == ['0,"Acme, Inc",Completed\r\n']
@@ -0,0 +1,101 @@
+import os
+import base64
+import urllib.parse
+
+import pytest
+
+import extract
+from bench.server import FIXTURES_DIR
+
+EXPECTED_SLUGS = [
+    "aarav-sharma-1a2b3c",
+    "priya-nair-dev",
+    "rohangupta",
+    "sneha-iyer-7781",
+    "vikram-rao-42",
+    "ananya-das-recruiter",
+    "karanmehta-ta",
+]
+
+PARSERS = {
+    "google": extract.parse_google_results,
+    "duckduckgo": extract.parse_duckduckgo_results,
+    "bing": extract.parse_bing_results,
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.html"), "rb") as f:
+        return f.read()
+
+
+def bing_redirect(target):
+    encoded = base64.urlsafe_b64encode(target.encode()).decode().rstrip("=")
+    return f"https://www.bing.com/ck/a?!&&p=abc&u=a1{encoded}&ntb=1"
+
+
+@pytest.mark.parametrize("engine", sorted(PARSERS))
+def test_parsers_find_every_profile_in_fixture(engine):
+    profiles = PARSERS[engine](read_fixture(engine), 10)
+    assert [p["url"] for p in profiles] == [f"https://www.linkedin.com/in/{slug}" for slug in EXPECTED_SLUGS]
+    assert profiles[0]["name"].startswith("Aarav Sharma")
+
+
+@pytest.mark.parametrize("engine", sorted(PARSERS))
+def test_parsers_stop_at_max_results(engine):
+    profiles = PARSERS[engine](read_fixture(engine), 3)
+    assert [p["url"].rsplit("/", 1)[1] for p in profiles] == EXPECTED_SLUGS[:3]
+
+
+def test_google_script_results_matches_html_parser():
+    payload = {"selector": "div.yuRUbf", "results": [
+        {"name": "Aarav Sharma", "url": "https://www.google.com/url?q=https://in.linkedin.com/in/aarav-sharma-1a2b3c&sa=U"},
+        {"name": "Not a profile", "url": "https://www.linkedin.com/company/acme"},
+        {"name": "Aarav again", "url": "https://www.linkedin.com/in/Aarav-Sharma-1a2b3c/"},
+        {"name": None, "url": "https://www.linkedin.com/in/rohangupta"},
+    ]}
+    assert extract.google_script_results(payload, 10) == [
+        {"name": "Aarav Sharma", "url": "https://www.linkedin.com/in/aarav-sharma-1a2b3c"},
+        {"name": "Unknown", "url": "https://www.linkedin.com/in/rohangupta"},
+    ]
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/in/priya-nair-dev",
+    "https://linkedin.com/in/priya-nair-dev",
+    "http://www.linkedin.com/in/priya-nair-dev/",
+    "https://in.linkedin.com/in/priya-nair-dev",
+    "https://uk.linkedin.com/in/Priya-Nair-Dev?trk=public_profile",
+    "https://www.linkedin.com/in/priya-nair-dev/en?originalSubdomain=in",
+    "https://www.linkedin.com/in/priya-nair-dev/details/experience/#top",
+    " https://www.linkedin.com/in/priya-nair-dev ",
+    "https://www.google.com/url?q=https://in.linkedin.com/in/priya-nair-dev&sa=U&ved=2ah",
+    "/url?q=https%3A%2F%2Fwww.linkedin.com%2Fin%2Fpriya-nair-dev%3Ftrk%3Dx&sa=U",
+    "https://duckduckgo.com/l/?uddg=" + urllib.parse.quote("https://in.linkedin.com/in/priya-nair-dev/", safe="")
+    + "&rut=abc",
+    "//duckduckgo.com/l/?uddg=" + urllib.parse.quote("https://www.linkedin.com/in/priya-nair-dev?trk=x", safe=""),
+    bing_redirect("https://in.linkedin.com/in/priya-nair-dev?trk=public"),
+])
+def test_canonical_profile_url(url):
+    assert extract.canonical_profile_url(url) == "https://www.linkedin.com/in/priya-nair-dev"
+
+
+@pytest.mark.parametrize("url", [
+    None,
+    "",
+    "https://www.linkedin.com/company/acme",
+    "https://www.linkedin.com/in/",
+    "https://notlinkedin.com/in/priya-nair-dev",
+    "https://www.linkedin.com.evil.example/in/priya-nair-dev",
+    "https://www.bing.com/ck/a?u=a1%%%invalid",
+    "https://www.google.com/search?q=linkedin.com/in/priya",
+])
+def test_canonical_profile_url_rejects_non_profiles(url):
+    assert extract.canonical_profile_url(url) is None
+
+
+def test_percent_encoded_slugs_are_canonicalized_once():
+    url = "https://www.linkedin.com/in/%C3%A1lvaro-p%C3%A9rez"
+    canonical = extract.canonical_profile_url(url)
+    assert canonical == "https://www.linkedin.com/in/%C3%A1lvaro-p%C3%A9rez"
+    assert extract.canonical_profile_url(canonical) == canonical
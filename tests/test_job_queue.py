@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from jobs import JobQueueFull, QUEUED, RUNNING, DONE, FAILED
+from job_queue import SQLiteJobQueue, open_job_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), max_pending=3, lease_seconds=600, max_attempts=2)
+
+
+def expire_leases(queue):
+    queue._connect().execute("UPDATE jobs SET lease_until = ? WHERE status = ?", (time.time() - 1, RUNNING))
+
+
+def test_submit_and_claim_in_order(queue):
+    first = queue.submit("scrape", {"company": "Acme"}, meta={"company": "Acme"})
+    second = queue.submit("scrape", {"company": "Globex"})
+    assert first.status == QUEUED
+
+    claimed = queue.claim("worker-1")
+    assert claimed["id"] == first.id
+    assert claimed["payload"] == {"company": "Acme"}
+    assert claimed["status"] == RUNNING
+    assert claimed["worker"] == "worker-1"
+    assert claimed["attempts"] == 1
+    assert queue.claim("worker-2")["id"] == second.id
+    assert queue.claim("worker-3") is None
+
+
+def test_complete_and_fail(queue):
+    done = queue.submit("scrape", {})
+    failed = queue.submit("scrape", {})
+    queue.claim("worker-1")
+    queue.claim("worker-1")
+    queue.complete(done.id, "worker-1", {"excel_data": []})
+    queue.fail(failed.id, "worker-1", "boom")
+
+    assert done.wait(timeout=1)
+    assert done.result == {"excel_data": []}
+    assert done.to_dict()["status"] == DONE
+    assert failed.refresh().status == FAILED
+    assert failed.error == "boom"
+    stats = queue.stats()
+    assert (stats[DONE], stats[FAILED], stats["pending"]) == (1, 1, 0)
+
+
+def test_expired_lease_is_retried_by_another_worker(queue):
+    job = queue.submit("scrape", {})
+    queue.claim("worker-1")
+    expire_leases(queue)
+
+    retried = queue.claim("worker-2")
+    assert retried["id"] == job.id
+    assert retried["worker"] == "worker-2"
+    assert retried["attempts"] == 2
+
+    # The worker that lost its lease can no longer finish the job
+    queue.complete(job.id, "worker-1", {"stale": True})
+    assert job.refresh().status == RUNNING
+    queue.complete(job.id, "worker-2", {"fresh": True})
+    assert job.refresh().result == {"fresh": True}
+
+
+def test_job_fails_after_max_attempts(queue):
+    job = queue.submit("scrape", {})
+    for worker in ("worker-1", "worker-2"):
+        assert queue.claim(worker)["id"] == job.id
+        expire_leases(queue)
+
+    assert queue.claim("worker-3") is None
+    job.refresh()
+    assert job.status == FAILED
+    assert job.error == "Worker lost"
+    assert job.attempts == 2
+
+
+def test_max_pending_counts_running_jobs(queue):
+    queue.submit("scrape", {})
+    queue.submit("scrape", {})
+    queue.claim("worker-1")
+    queue.submit("scrape", {})
+    with pytest.raises(JobQueueFull):
+        queue.submit("scrape", {})
+
+    job = queue.claim("worker-1")
+    queue.complete(job["id"], "worker-1", {})
+    queue.submit("scrape", {})
+
+
+def test_stats_and_workers(queue):
+    queue.submit("scrape", {})
+    queue.heartbeat("worker-1")
+    queue.claim("worker-2")
+    stats = queue.stats()
+    assert stats[QUEUED] == 0
+    assert stats[RUNNING] == 1
+    assert stats["workers"] == 2
+    assert stats["capacity"] == 3
+
+
+def test_open_job_queue(tmp_path):
+    queue = open_job_queue(f"sqlite:///{tmp_path}/jobs.sqlite3", max_pending=5)
+    assert isinstance(queue, SQLiteJobQueue)
+    assert queue.path == f"{tmp_path}/jobs.sqlite3"
+    assert open_job_queue("sqlite:///jobs.sqlite3").path == "jobs.sqlite3"
+    with pytest.raises(ValueError):
+        open_job_queue("postgres://localhost/jobs")
@@ -0,0 +1,85 @@
+import time
+import threading
+
+import pytest
+
+from deadline import Deadline, DeadlineExceeded
+from rate_limit import HostThrottle, parse_host_delays
+
+
+def test_parse_host_delays():
+    assert parse_host_delays("www.google.com=2, bing.com=0.5,broken,x=y") == {"www.google.com": 2.0, "bing.com": 0.5}
+    assert parse_host_delays(None) == {}
+
+
+def test_requests_to_one_host_are_spaced_out():
+    throttle = HostThrottle(default_delay=0.05, host_delays={"slow.example": 0.1})
+    started = time.monotonic()
+    for _ in range(3):
+        throttle.wait("https://fast.example/search?q=1")
+    assert 0.09 <= time.monotonic() - started < 0.5
+    # Other hosts have their own schedule
+    assert throttle.wait("https://slow.example/") == 0
+
+
+def test_concurrent_callers_queue_instead_of_bursting():
+    throttle = HostThrottle(default_delay=0.03)
+    pauses = []
+    lock = threading.Lock()
+
+    def call():
+        pause = throttle.wait("host.example")
+        with lock:
+            pauses.append(pause)
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Each caller got its own slot, a delay apart, instead of all going at once
+    assert time.monotonic() - started >= 0.11
+    assert sorted(pauses)[-1] >= 0.09
+
+
+def test_budget_caps_requests_per_window():
+    throttle = HostThrottle(budget=3, window=0.2)
+    started = time.monotonic()
+    for _ in range(3):
+        assert throttle.wait("host.example") == 0
+    assert throttle.stats() == {"host.example": 3}
+    pause = throttle.wait("host.example")
+    assert 0.15 <= pause <= 0.2
+    assert time.monotonic() - started >= 0.15
+
+
+def test_slot_past_the_deadline_is_refused_without_being_taken():
+    throttle = HostThrottle(default_delay=1.0)
+    throttle.wait("host.example")
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        throttle.wait("host.example", Deadline(0.2))
+    assert time.monotonic() - started < 0.1
+    # The refused call didn't push the next slot back another second
+    assert throttle.wait("host.example", Deadline(1.5)) <= 1.0
+
+
+def test_expired_deadline_is_refused_up_front():
+    throttle = HostThrottle(budget=1, window=60)
+    deadline = Deadline(0)
+    with pytest.raises(DeadlineExceeded):
+        throttle.wait("host.example", deadline)
+    assert throttle.stats() == {}
+    assert throttle.wait("host.example") == 0
+
+
+def test_cancelled_caller_stops_sleeping():
+    throttle = HostThrottle(default_delay=2.0)
+    throttle.wait("host.example")
+    deadline = Deadline(5)
+    threading.Timer(0.1, deadline.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        throttle.wait("host.example", deadline)
+    assert time.monotonic() - started < 0.5
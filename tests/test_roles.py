@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from roles import DEFAULT_ROLES, Role, load_roles, table_columns
+
+
+def test_defaults_when_unset():
+    assert load_roles("") == DEFAULT_ROLES
+    assert table_columns(DEFAULT_ROLES)[:4] == ["Company Name", "Status", "SDE 1 Name", "SDE 2 Name"]
+    assert len(table_columns(DEFAULT_ROLES)) == 2 + 2 * (5 + 2)
+
+
+def test_query_keeps_literal_braces():
+    role = Role("pm", "PM", 'site:linkedin.com/in/ "{company}" {"Product Manager"} {0}', 1)
+    assert role.query_for("Acme {Labs}") == 'site:linkedin.com/in/ "Acme {Labs}" {"Product Manager"} {0}'
+
+
+def test_load_inline_and_from_file(tmp_path):
+    spec = [{"name": "pm", "query": "{company} PM", "slots": 3}, {"name": "qa", "label": "QA", "query": "{company} QA"}]
+    inline = load_roles(json.dumps(spec))
+    path = tmp_path / "roles.json"
+    path.write_text(json.dumps(spec))
+    from_file = load_roles(str(path))
+    for roles in (inline, from_file):
+        assert [(r.name, r.label, r.slots) for r in roles] == [("pm", "PM", 3), ("qa", "QA", 1)]
+
+
+@pytest.mark.parametrize("spec", [
+    '[{"name": "pm", "query": "PM at Acme"}]',
+    '[{"name": "pm", "query": 42}]',
+    '[{"name": "pm", "query": "{company}", "slots": 0}]',
+    '[{"name": "pm", "query": "{company}"}, {"name": "pm", "query": "{company} 2"}]',
+    '[]',
+])
+def test_invalid_templates_fail_at_load(spec):
+    with pytest.raises(ValueError):
+        load_roles(spec)
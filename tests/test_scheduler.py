@@ -0,0 +1,106 @@
+import json
+import time
+
+from scheduler import EngineScheduler
+
+NAMES = ["duckduckgo", "bing", "google"]
+
+
+def scheduler(tmp_path=None, **kwargs):
+    path = str(tmp_path / "engine_stats.json") if tmp_path is not None else None
+    return EngineScheduler(NAMES, path, **kwargs)
+
+
+def test_untried_engines_keep_configured_order():
+    assert scheduler().order(NAMES) == NAMES
+    assert scheduler().order(["google", "bing"]) == ["google", "bing"]
+
+
+def test_fast_reliable_engine_moves_first():
+    s = scheduler()
+    for _ in range(5):
+        s.record("google", "hits", 0.3)
+        s.record("duckduckgo", "empty", 0.3)
+        s.record("bing", "hits", 1.0)
+    assert s.order(NAMES) == ["google", "bing", "duckduckgo"]
+
+
+def test_fast_empty_answers_do_not_look_free():
+    s = scheduler()
+    for _ in range(10):
+        s.record("duckduckgo", "empty", 0.0)
+        s.record("bing", "hits", 0.3)
+    assert s.order(["duckduckgo", "bing"]) == ["bing", "duckduckgo"]
+
+
+def test_timeouts_count_as_slow_misses_and_cancellations_are_ignored():
+    s = scheduler()
+    for _ in range(6):
+        s.record("duckduckgo", "timeouts", 20.0)
+        s.record("bing", "cancelled", 0.1)
+    stats = s.stats()
+    assert stats["duckduckgo"]["success_rate"] < 0.2
+    assert stats["duckduckgo"]["latency_seconds"] > 10
+    assert stats["bing"] == scheduler().stats()["bing"]
+    assert s.order(["duckduckgo", "bing"]) == ["bing", "duckduckgo"]
+
+
+def test_engine_that_keeps_coming_back_empty_is_written_off_then_probed():
+    s = scheduler(probe_interval=0.2)
+    for _ in range(40):
+        s.record("duckduckgo", "empty", 0.1)
+    assert s.stats()["duckduckgo"]["skipped"]
+    assert "duckduckgo" not in s.order(NAMES)
+    # Never write off everything: the best of the rest is still tried
+    assert s.order(["duckduckgo"]) == ["duckduckgo"]
+    time.sleep(0.25)
+    assert "duckduckgo" in s.order(NAMES)
+
+
+def test_overload_backs_off_exponentially_and_resets_on_a_hit():
+    s = scheduler(base_backoff=10, max_backoff=25)
+    s.overloaded("bing")
+    assert s.order(NAMES) == ["duckduckgo", "google"]
+    assert 9 <= s.stats()["bing"]["backoff_remaining"] <= 10
+    s.overloaded("bing")
+    assert 19 <= s.stats()["bing"]["backoff_remaining"] <= 20
+    s.overloaded("bing")
+    assert 24 <= s.stats()["bing"]["backoff_remaining"] <= 25
+    s.overloaded("bing", retry_after=100)
+    assert s.stats()["bing"]["backoff_remaining"] > 90
+    assert s.retry_after(["bing"]) in (100, 101)
+    s.record("bing", "hits", 0.2)
+    s._state["bing"]["backoff_until"] = 0
+    s.overloaded("bing")
+    assert s.stats()["bing"]["backoff_remaining"] <= 10
+
+
+def test_every_engine_backing_off_leaves_nothing_to_try():
+    s = scheduler(base_backoff=30)
+    for name in NAMES:
+        s.overloaded(name)
+    assert s.order(NAMES) == []
+    assert 29 <= s.retry_after(NAMES) <= 30
+
+
+def test_state_survives_a_restart(tmp_path):
+    s = scheduler(tmp_path, save_interval=0)
+    for _ in range(5):
+        s.record("google", "hits", 0.2)
+        s.record("duckduckgo", "empty", 1.0)
+    s.overloaded("bing", retry_after=300)
+
+    restored = scheduler(tmp_path)
+    assert restored.order(NAMES) == ["google", "duckduckgo"]
+    assert restored.stats()["google"] == s.stats()["google"]
+    assert restored.stats()["bing"]["overloads"] == 1
+
+
+def test_corrupt_or_foreign_state_is_ignored(tmp_path):
+    path = tmp_path / "engine_stats.json"
+    path.write_text("{not json")
+    assert scheduler(tmp_path).order(NAMES) == NAMES
+    path.write_text(json.dumps({"altavista": {"weight": 9}, "bing": {"hits": 3.0, "weight": 3.0, "bogus": 1}}))
+    s = scheduler(tmp_path)
+    assert "altavista" not in s.stats()
+    assert s.stats()["bing"]["success_rate"] > 0.5
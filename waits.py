@@ -0,0 +1,100 @@
+import os
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from extract import RESULT_SELECTORS
+import metrics
+from deadline import clamp
+
+# Ceilings (seconds) for each kind of wait; waits return as soon as the page is ready
+PAGE_LOAD_TIMEOUT = float(os.environ.get('WAIT_PAGE_LOAD_TIMEOUT', 10))
+RESULTS_TIMEOUT = float(os.environ.get('WAIT_RESULTS_TIMEOUT', 5))
+BLOCK_CLEAR_TIMEOUT = float(os.environ.get('WAIT_BLOCK_CLEAR_TIMEOUT', 20))
+AFTER_CLICK_TIMEOUT = float(os.environ.get('WAIT_AFTER_CLICK_TIMEOUT', 5))
+POLL_FREQUENCY = float(os.environ.get('WAIT_POLL_FREQUENCY', 0.1))
+
+# Elements that only appear on block / CAPTCHA pages
+BLOCK_SELECTORS = [
+    "form#captcha-form",
+    "#recaptcha",
+    "iframe[src*='recaptcha']",
+    "iframe[src*='hcaptcha']",
+]
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def any_element_present(selectors):
+    """Condition that returns the first selector with a match, or False."""
+    def condition(driver):
+        for selector in selectors:
+            if driver.find_elements(By.CSS_SELECTOR, selector):
+                return selector
+        return False
+    return condition
+
+
+def no_element_present(selectors):
+    """Condition that holds once none of the selectors match any more."""
+    combined = ", ".join(selectors)
+
+    def condition(driver):
+        return not driver.find_elements(By.CSS_SELECTOR, combined)
+    return condition
+
+
+def wait_until(driver, condition, timeout, name, deadline=None):
+    """Wait for `condition` up to `timeout` seconds, recording how long it took.
+
+    The ceiling is shrunk to whatever `deadline` leaves. Returns the
+    condition's value, or None if the ceiling was reached.
+    """
+    timeout = clamp(deadline, timeout)
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        outcome = "ready"
+    except TimeoutException:
+        result = None
+        outcome = "timeout"
+    elapsed = time.monotonic() - started
+    record_wait(name, elapsed, outcome)
+    print(f"Wait '{name}': {outcome} after {elapsed:.2f}s")
+    return result
+
+
+def wait_for_results_page(driver, timeout=None, deadline=None):
+    """Wait until a result container or a block page marker shows up."""
+    timeout = PAGE_LOAD_TIMEOUT if timeout is None else timeout
+    return wait_until(driver, any_element_present(["#search"] + RESULT_SELECTORS + BLOCK_SELECTORS),
+                      timeout, "page_load", deadline)
+
+
+def record_wait(name, seconds, outcome):
+    metrics.WAIT_SECONDS.observe(seconds, wait=name, outcome=outcome)
+    if outcome == "timeout":
+        metrics.TIMEOUTS.inc(stage=f"wait_{name}")
+    with _stats_lock:
+        entry = _stats.setdefault(name, {"count": 0, "timeouts": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        entry["count"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        if outcome == "timeout":
+            entry["timeouts"] += 1
+
+
+def wait_stats():
+    """Per-wait counts, timeouts and average/max durations in seconds."""
+    with _stats_lock:
+        return {
+            name: {
+                "count": entry["count"],
+                "timeouts": entry["timeouts"],
+                "avg_seconds": round(entry["total_seconds"] / entry["count"], 3),
+                "max_seconds": round(entry["max_seconds"], 3),
+            }
+            for name, entry in _stats.items()
+        }
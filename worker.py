@@ -0,0 +1,106 @@
+"""Browser worker: runs scrapes from the shared job queue and writes results back.
+
+Runs next to the API (`app:app`), which only enqueues and reads results when
+JOB_QUEUE_URL is set. Start as many as the box has memory for, on as many
+boxes as share the queue:
+
+    JOB_QUEUE_URL=sqlite:////tmp/scrape_cache/jobs.sqlite3 python worker.py
+"""
+import os
+import time
+import socket
+import signal
+import threading
+import app
+import metrics
+from deadline import Deadline
+
+# Scrapes run at once in this process; each holds one pooled browser
+WORKER_CONCURRENCY = int(os.environ.get('WORKER_CONCURRENCY', app.DRIVER_POOL_SIZE))
+WORKER_HEARTBEAT_INTERVAL = float(os.environ.get('WORKER_HEARTBEAT_INTERVAL', 10))
+
+
+def run_scrape(payload):
+    company_name = payload["company"]
+    deadline_at = payload.get("deadline_at")
+    if deadline_at is None:
+        deadline = Deadline(app.SCRAPE_TIMEOUT)
+    else:
+        remaining = deadline_at - time.time()
+        if remaining <= 0:
+            # The API already answered this request with a timeout; don't spend a browser on it
+            metrics.TIMEOUTS.inc(stage="queue")
+            return app.create_empty_result(company_name, "Timeout Error", "Deadline passed while queued.")
+        deadline = Deadline(remaining)
+    return app.scrape_with_selenium(company_name, deadline)
+
+
+HANDLERS = {"scrape": run_scrape}
+
+
+class Worker:
+    """Claims jobs from `queue` on `concurrency` threads until stopped."""
+
+    def __init__(self, queue, concurrency=1):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.slots = [f"{self.id}#{n}" for n in range(self.concurrency)]
+        self._stop = threading.Event()
+
+    def run(self):
+        print(f"Worker {self.id} starting {self.concurrency} slot(s)")
+        app.warm_up(min(app.WARMUP_BROWSERS, self.concurrency))
+        threads = [threading.Thread(target=self._loop, args=(slot,), name=f"worker-{n}")
+                   for n, slot in enumerate(self.slots)]
+        for thread in threads:
+            thread.start()
+        while not self._stop.wait(WORKER_HEARTBEAT_INTERVAL):
+            for slot in self.slots:
+                try:
+                    self.queue.heartbeat(slot)
+                except Exception as e:
+                    print(f"Worker heartbeat failed: {e}")
+        for thread in threads:
+            thread.join()
+        app.shutdown_driver_pool()
+        print(f"Worker {self.id} stopped")
+
+    def stop(self, *_):
+        """Finish the jobs in hand, then exit."""
+        self._stop.set()
+
+    def _loop(self, slot):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(slot)
+            except Exception as e:
+                print(f"!!! Could not claim a job: {e} !!!")
+                self._stop.wait(self.queue.poll_interval * 4)
+                continue
+            if job is None:
+                self._stop.wait(self.queue.poll_interval)
+                continue
+
+            handler = HANDLERS.get(job["kind"])
+            print(f"Worker {slot} running job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job['kind']}")
+                self.queue.complete(job["id"], slot, handler(job["payload"]))
+            except Exception as e:
+                print(f"!!! Job {job['id']} failed: {e} !!!")
+                self.queue.fail(job["id"], slot, str(e))
+
+
+def main():
+    if app.job_queue is None:
+        raise SystemExit("JOB_QUEUE_URL must point at the queue the API enqueues to")
+    worker = Worker(app.job_queue, WORKER_CONCURRENCY)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()